@@ -0,0 +1,71 @@
+import json
+import os
+from datetime import datetime
+import joblib
+import numpy as np
+import sklearn
+from feature_store import file_hash, params_hash
+from state import MatchState
+
+ARTIFACT_DIR = 'artifacts'
+
+# Bump when the on-disk layout or the meaning of the saved state changes
+ARTIFACT_VERSION = 5
+
+
+def save_artifacts(clf, state, meta, directory=ARTIFACT_DIR):
+    """
+    Writes model.joblib, state.npz and meta.json. meta.json is written last,
+    so a directory without it (or with an older one) is never half-trusted.
+    """
+    os.makedirs(directory, exist_ok=True)
+    joblib.dump(clf, os.path.join(directory, 'model.joblib'))
+    return save_state(state, meta, directory)
+
+
+def save_state(state, meta, directory=ARTIFACT_DIR):
+    """
+    Rewrites state.npz and meta.json next to an existing model, e.g. after
+    folding new results into the state without retraining.
+    """
+    tmp = os.path.join(directory, 'state.tmp.npz')
+    np.savez(tmp, **state.to_arrays())
+    os.replace(tmp, os.path.join(directory, 'state.npz'))
+
+    meta = {
+        **meta,
+        'artifact_version': ARTIFACT_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'feature_params': state.params,
+        'feature_params_hash': params_hash(state.params),
+        'state_as_of': str(state.last_match_date.date()) if state.last_match_date is not None else None,
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_artifacts(directory=ARTIFACT_DIR):
+    """Returns (clf, state, meta). Raises if the artifacts are missing or from an incompatible build."""
+    meta_path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"No artifacts in '{directory}'. Run 'python predictor.py retrain' first.")
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('artifact_version') != ARTIFACT_VERSION:
+        raise ValueError(f"Artifacts in '{directory}' are version {meta.get('artifact_version')}, "
+                         f"expected {ARTIFACT_VERSION}. Run 'python predictor.py retrain'.")
+    if meta.get('sklearn_version') != sklearn.__version__:
+        print(f"[!] Model was saved with scikit-learn {meta.get('sklearn_version')}, running {sklearn.__version__}.")
+
+    clf = joblib.load(os.path.join(directory, 'model.joblib'))
+    with np.load(os.path.join(directory, 'state.npz'), allow_pickle=False) as data:
+        state = MatchState.from_arrays(data, meta['feature_params'])
+    return clf, state, meta
+
+
+def is_stale(meta, filename):
+    """True if the CSV changed since the artifacts were trained."""
+    return meta.get('csv_hash') != file_hash(filename)
@@ -0,0 +1,180 @@
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import sklearn
+from dataset import cache_path, read_matches
+from features import FEATURE_PARAMS, build_features, feature_columns, load_matches
+from form import compute_form
+from lineups import cache_path as lineups_cache_path, load_lineups
+from models import home_win_probability, make_model
+from player_strength import PlayerStrengthEngine
+from ratings import TeamRatings
+from state import MatchState
+from synthetic import generate_league, round_robin
+
+RESULTS_FILE = 'bench_results.json'
+BASE_ROWS = 1000  # About the size of the real scrape; scale 10 = 10x that
+NOISE_FLOOR_S = 0.005  # Slowdowns smaller than this are timer noise, whatever the ratio
+
+
+def measure(fn, setup=None, repeat=3):
+    """
+    (result, best wall time of `repeat` runs, peak traced MB of one extra run).
+    Memory is traced in a separate run so tracemalloc doesn't skew the timings.
+    `setup` runs untimed before each call (e.g. to drop a cache).
+    """
+    best = math.inf
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak / 2**20
+
+
+def remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def bench_scale(filename, params=FEATURE_PARAMS, repeat=3):
+    """Times and memory-profiles each pipeline stage on one CSV. Returns {stage: metrics}."""
+    stages = {}
+
+    def run(name, fn, setup=None, rows=None):
+        result, seconds, peak_mb = measure(fn, setup, repeat)
+        stages[name] = {'seconds': round(seconds, 4), 'peak_mb': round(peak_mb, 2),
+                        'rows': rows if rows is not None else (len(result) if hasattr(result, '__len__') else None)}
+        print(f"  {name:<16} {seconds * 1000:10.1f} ms {peak_mb:9.1f} MB")
+        return result
+
+    run('csv_read', lambda: pd.read_csv(filename))
+    run('typed_build', lambda: read_matches(filename), setup=lambda: remove(cache_path(filename)))
+    run('typed_load', lambda: read_matches(filename))
+    df = run('load_matches', lambda: load_matches(filename))
+    lineups = run('lineup_parse', lambda: load_lineups(filename, df), setup=lambda: remove(lineups_cache_path(filename)),
+                  rows=len(df))
+    run('form', lambda: compute_form(df, params), rows=len(df))
+    run('elo', lambda: TeamRatings.from_params(params).run(df), rows=len(df))
+    run('player_strength', lambda: PlayerStrengthEngine(C=params['C'], global_mean=0.5, decay=params['decay'])
+        .run(df, lineups=lineups), rows=len(df))
+    frame = run('build_features', lambda: build_features(df, params, lineups=lineups))
+
+    features = feature_columns(params)
+    train = frame[frame['Winner'].notna()].dropna(subset=features)
+    fixtures = df[df['Winner'].isna()]
+    clf = run('train', lambda: make_model(n_jobs=1).fit(train[features], train['Target']), rows=len(train))
+    state = run('state_build', lambda: MatchState.from_matches(df, params, lineups), rows=len(df))
+    X = run('state_features', lambda: state.features(fixtures), rows=len(fixtures))
+    run('predict', lambda: home_win_probability(clf, X[features]), rows=len(fixtures))
+    return stages
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def compare(results, baseline, tolerance=1.2):
+    """
+    Stages slower than `tolerance` x the baseline run at the same scale (and
+    by more than NOISE_FLOOR_S). Returns a list of messages.
+    """
+    old = {s['scale']: s['stages'] for s in baseline['scales']}
+    regressions = []
+    for entry in results['scales']:
+        before = old.get(entry['scale'])
+        if before is None:
+            continue
+        for stage, now in entry['stages'].items():
+            if stage not in before or before[stage]['seconds'] <= 0:
+                continue
+            ratio = now['seconds'] / before[stage]['seconds']
+            flag = ratio > tolerance and now['seconds'] - before[stage]['seconds'] > NOISE_FLOOR_S
+            print(f"  x{entry['scale']:<5g} {stage:<16} {before[stage]['seconds'] * 1000:10.1f} -> "
+                  f"{now['seconds'] * 1000:10.1f} ms ({ratio:5.2f}x){'  REGRESSION' if flag else ''}")
+            if flag:
+                regressions.append(f"x{entry['scale']:g} {stage}: {ratio:.2f}x slower")
+    return regressions
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile each pipeline stage on synthetic leagues.")
+    parser.add_argument('--scales', type=float, nargs='*', default=[1, 10],
+                        help=f"Data sizes as multiples of {BASE_ROWS} matches (default: 1 10)")
+    parser.add_argument('--teams', type=int, default=14, help="Clubs per league (seasons grow with the scale)")
+    parser.add_argument('--squad-size', type=int, default=40)
+    parser.add_argument('--turnover', type=float, default=0.25)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=1.2, help="Slowdown ratio flagged as a regression")
+    parser.add_argument('--keep-data', help="Directory to keep the generated CSVs in (default: a temp dir)")
+    args = parser.parse_args()
+
+    per_season = sum(len(day) for day in round_robin(args.teams))
+    workdir = args.keep_data or tempfile.mkdtemp(prefix='bench_')
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {'created': datetime.now().isoformat(timespec='seconds'), 'environment': environment(),
+               'config': {'teams': args.teams, 'squad_size': args.squad_size, 'turnover': args.turnover,
+                          'repeat': args.repeat, 'seed': args.seed, 'feature_params': FEATURE_PARAMS},
+               'scales': []}
+    try:
+        for scale in args.scales:
+            seasons = max(2, math.ceil(scale * BASE_ROWS / per_season))
+            filename = os.path.join(workdir, f"synthetic_x{scale:g}.csv")
+            start = time.perf_counter()
+            league = generate_league(args.teams, seasons, args.squad_size, args.turnover, seed=args.seed)
+            league.to_csv(filename, index=False)
+            rows = len(league)
+            del league
+            print(f"Scale x{scale:g}: {rows} matches, {seasons} seasons (generated in {time.perf_counter() - start:.1f}s)")
+            results['scales'].append({'scale': scale, 'rows': rows, 'seasons': seasons,
+                                      'stages': bench_scale(filename, repeat=args.repeat)})
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} ({baseline.get('created')}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed by more than {args.tolerance:g}x.")
+            sys.exit(1)
@@ -0,0 +1,45 @@
+from datetime import date
+
+# Everything competition-specific. Each competition has its own CSV (and so
+# its own SQLite store, typed/lineup caches and feature store files).
+COMPETITIONS = {
+    'top14': {
+        'name': 'Top 14',
+        'base_url': 'https://top14.lnr.fr',
+        'data_file': 'Top14_Raw_Scrape.csv',
+        'first_season': 2020,
+        'rounds': 26,
+        'games_per_round': 7,
+        # Playoff phase slug -> games it holds
+        'playoff_phases': {'barrage': 2, 'demi-finale': 2, 'finale': 1, 'access-top-14': 1, 'match-daccession': 1},
+    },
+    'prod2': {
+        'name': 'Pro D2',
+        'base_url': 'https://prod2.lnr.fr',
+        'data_file': 'ProD2_Raw_Scrape.csv',
+        'first_season': 2020,
+        'rounds': 30,
+        'games_per_round': 8,
+        'playoff_phases': {'barrage': 2, 'demi-finale': 2, 'finale': 1, 'access-top-14': 1},
+    },
+}
+
+DEFAULT_COMPETITION = 'top14'
+
+# Seasons start in August
+SEASON_START_MONTH = 8
+
+
+def season_label(year):
+    return f"{year}-{year + 1}"
+
+
+def current_season(today=None):
+    today = today or date.today()
+    return season_label(today.year if today.month >= SEASON_START_MONTH else today.year - 1)
+
+
+def competition_seasons(key, today=None):
+    """Season labels of a competition, from its first season to the current one."""
+    last = int(current_season(today)[:4])
+    return [season_label(y) for y in range(COMPETITIONS[key]['first_season'], last + 1)]
@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+DATA_FILE = 'Top14_Raw_Scrape.csv'
+
+# Dates accepted from users and API clients: ISO first, then the scrape's dd/mm/yyyy
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y']
+
+# Bump when the typed layout below changes
+SCHEMA_VERSION = 1
+
+# Column groups: core match facts, per-team stats (everything else numeric), lineups
+CORE_COLUMNS = ['Season', 'Phase', 'Date', 'Time', 'Home_Team', 'Away_Team', 'Home_Score', 'Away_Score', 'Winner', 'Referee']
+LINEUP_COLUMNS = ['Home_Lineup', 'Away_Lineup']
+
+# Home_Team, Away_Team and Winner share one dtype (teams + 'Draw') so they compare directly
+TEAM_COLUMNS = ['Home_Team', 'Away_Team', 'Winner']
+CATEGORY_COLUMNS = ['Season', 'Phase', 'Time', 'Referee']
+SCORE_COLUMNS = ['Home_Score', 'Away_Score']
+SCORE_DTYPE = np.int16
+STAT_DTYPE = np.float32
+
+
+def file_hash(filename):
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parse_date(value):
+    """
+    One date in one of DATE_FORMATS, as a Timestamp. Formats are tried in
+    order, never guessed, so 2025-12-06 is always 6 December.
+    """
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return pd.Timestamp(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return pd.to_datetime(str(value), format=fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}: use YYYY-MM-DD or DD/MM/YYYY.")
+
+
+def cache_path(filename):
+    root, _ = os.path.splitext(filename)
+    return f"{root}.columns.npz"
+
+
+def save_npz(path, arrays):
+    """
+    np.savez to a uniquely named temp file next to `path`, then an atomic
+    rename, so concurrent writers (e.g. search or league worker processes
+    on a cold cache) never collide and readers never see a partial file.
+    """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', suffix='.tmp.npz', delete=False) as f:
+        tmp = f.name
+        try:
+            np.savez(f, **arrays)
+        except BaseException:
+            f.close()
+            os.remove(tmp)
+            raise
+    os.replace(tmp, path)
+
+
+def stat_columns(columns):
+    return [c for c in columns if c not in CORE_COLUMNS and c not in LINEUP_COLUMNS]
+
+
+def expand_columns(columns, available):
+    """Column list with the group names 'core', 'stats' and 'lineups' expanded."""
+    if columns is None:
+        return list(available)
+    groups = {'core': CORE_COLUMNS, 'stats': stat_columns(available), 'lineups': LINEUP_COLUMNS}
+    out = []
+    for c in columns:
+        for name in groups.get(c, [c]):
+            if name not in available:
+                raise KeyError(f"Unknown column {name!r}")
+            if name not in out:
+                out.append(name)
+    return out
+
+
+def categorize(df):
+    """Name columns present in df as categoricals, the team ones sharing a single dtype (in place)."""
+    team_columns = [c for c in TEAM_COLUMNS if c in df]
+    if team_columns:
+        teams = pd.concat([df[c].astype(object) for c in team_columns]).dropna().unique()
+        team_dtype = pd.CategoricalDtype(sorted(set(teams) | {'Draw'}))
+        for c in team_columns:
+            df[c] = df[c].astype(object).astype(team_dtype)
+    for c in CATEGORY_COLUMNS:
+        if c in df:
+            df[c] = df[c].astype(object).astype('category')
+    return df
+
+
+def typed_frame(df):
+    """
+    The raw scrape converted to the shared schema: categorical names, dates
+    parsed as dd/mm/yyyy, int16 scores, float32 stats, rows in date order
+    (stable, so same-day games keep their file order).
+    """
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y')
+    df = df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+    categorize(df)
+    for c in SCORE_COLUMNS:
+        # Future games are scraped as 0-0
+        df[c] = pd.to_numeric(df[c]).fillna(0).astype(SCORE_DTYPE)
+    for c in stat_columns(df.columns):
+        df[c] = pd.to_numeric(df[c], errors='coerce').astype(STAT_DTYPE)
+    for c in LINEUP_COLUMNS:
+        df[c] = df[c].astype(object)
+    return df
+
+
+class MatchTable:
+    """
+    Typed columnar copy of the scrape, stored as one .npz next to the CSV
+    (one array per column, so a projection only reads what it asks for).
+    Categoricals are codes + categories, lineups are one UTF-8 blob + offsets.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    # ---------------------------------------------------------
+    # WRITE
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def write(path, df, csv_hash):
+        arrays = {}
+        team_dtype = df['Home_Team'].dtype
+        arrays['teams.categories'] = np.array(team_dtype.categories, dtype=str)
+        for c in df.columns:
+            col = df[c]
+            if c in TEAM_COLUMNS:
+                arrays[f'{c}.codes'] = col.cat.codes.to_numpy().astype(np.int16)
+            elif isinstance(col.dtype, pd.CategoricalDtype):
+                arrays[f'{c}.codes'] = col.cat.codes.to_numpy().astype(np.int16)
+                arrays[f'{c}.categories'] = np.array(col.cat.categories, dtype=str)
+            elif c in LINEUP_COLUMNS:
+                present = col.notna().to_numpy()
+                encoded = [t.encode() for t in col.where(present, '').astype(str)]
+                arrays[f'{c}.offsets'] = np.concatenate([[0], np.cumsum([len(t) for t in encoded])]).astype(np.int64)
+                arrays[f'{c}.utf8'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+                arrays[f'{c}.present'] = present
+            else:
+                arrays[c] = col.to_numpy()
+        arrays['__meta__'] = np.array(json.dumps({'csv_hash': csv_hash, 'version': SCHEMA_VERSION,
+                                                  'columns': list(df.columns), 'rows': len(df)}))
+        save_npz(path, arrays)
+
+    # ---------------------------------------------------------
+    # READ
+    # ---------------------------------------------------------
+
+    def meta(self):
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path, allow_pickle=False) as data:
+            return json.loads(str(data['__meta__']))
+
+    def read(self, columns=None, seasons=None, start=None, end=None):
+        """
+        Frame with the requested columns (names or groups), keeping only rows
+        of `seasons` and with start <= Date < end. Filter columns are read
+        first so the mask applies before the other columns are decoded.
+        """
+        with np.load(self.path, allow_pickle=False) as data:
+            meta = json.loads(str(data['__meta__']))
+            columns = expand_columns(columns, meta['columns'])
+            team_categories = data['teams.categories']
+
+            mask = np.ones(meta['rows'], dtype=bool)
+            if seasons is not None:
+                if isinstance(seasons, str):
+                    seasons = [seasons]
+                categories = data['Season.categories'].tolist()
+                wanted = [categories.index(s) for s in seasons if s in categories]
+                mask &= np.isin(data['Season.codes'], wanted)
+            if start is not None or end is not None:
+                dates = data['Date']
+                if start is not None:
+                    mask &= dates >= np.datetime64(pd.Timestamp(start))
+                if end is not None:
+                    mask &= dates < np.datetime64(pd.Timestamp(end))
+            rows = None if mask.all() else np.flatnonzero(mask)
+
+            def take(a):
+                return a if rows is None else a[rows]
+
+            out = {}
+            for c in columns:
+                if c in TEAM_COLUMNS:
+                    out[c] = pd.Categorical.from_codes(take(data[f'{c}.codes']), dtype=pd.CategoricalDtype(team_categories))
+                elif c in LINEUP_COLUMNS:
+                    offsets, present = data[f'{c}.offsets'], data[f'{c}.present']
+                    blob = data[f'{c}.utf8'].tobytes()
+                    idx = range(len(present)) if rows is None else rows
+                    out[c] = np.array([blob[offsets[i]:offsets[i + 1]].decode() if present[i] else np.nan for i in idx], dtype=object)
+                elif f'{c}.codes' in data:
+                    out[c] = pd.Categorical.from_codes(take(data[f'{c}.codes']), categories=data[f'{c}.categories'])
+                else:
+                    out[c] = take(data[c])
+        return pd.DataFrame(out)
+
+
+def read_matches(filename=DATA_FILE, columns=None, seasons=None, start=None, end=None):
+    """
+    The scrape in the shared typed schema, in date order. The typed copy
+    (<csv>.columns.npz) is rebuilt from the CSV only when the CSV changed;
+    every other call is a read of the requested columns and rows.
+
+    columns: names and/or groups ('core', 'stats', 'lineups'); None = all.
+    seasons: season label or iterable of labels to keep. start/end: date bounds
+    (start inclusive, end exclusive), anything pd.Timestamp accepts.
+    """
+    table = MatchTable(cache_path(filename))
+    csv_hash = file_hash(filename)
+    meta = table.meta()
+    if meta is None or meta['csv_hash'] != csv_hash or meta['version'] != SCHEMA_VERSION:
+        MatchTable.write(table.path, typed_frame(pd.read_csv(filename)), csv_hash)
+    return table.read(columns, seasons, start, end)
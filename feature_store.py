@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from features import DATA_FILE, FEATURE_PARAMS, KEY_COLUMNS, feature_columns, file_hash, load_matches, build_features
+from dataset import categorize, save_npz
+from lineups import load_lineups
+from instrument import stage
+
+STORE_DIR = 'feature_store'
+
+# Bump when build_features changes in a way that invalidates stored frames
+FEATURE_VERSION = 4
+
+STRING_COLUMNS = ['Season', 'Phase', 'Home_Team', 'Away_Team', 'Winner']
+
+
+def store_columns(params):
+    return KEY_COLUMNS + ['Target'] + feature_columns(params)
+
+
+def params_hash(params):
+    payload = json.dumps({'version': FEATURE_VERSION, 'params': params}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def row_hashes(df, columns):
+    """One uint64 per raw match row, used to find where the scrape changed."""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class FeatureStore:
+    """
+    Caches the engineered feature frame as a NumPy .npz (one array per column).
+
+    There is one file per (source CSV, feature-parameter set). Inside it we keep the hash of
+    the CSV it was built from, so an unchanged CSV is a straight load. When the
+    CSV changed, rows before the first changed date are reused and only the
+    matches from that date on are recomputed.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+
+    def path(self, filename, params):
+        source = os.path.splitext(os.path.basename(filename))[0]
+        return os.path.join(self.directory, f"features_{source}_{params_hash(params)}.npz")
+
+    def load(self, filename=DATA_FILE, params=FEATURE_PARAMS, run=None):
+        """Feature frame for `filename`. Pass an instrument.RunReport as `run` to time each step."""
+        path = self.path(filename, params)
+        with stage(run, 'feature_cache_read') as st:
+            csv_hash = file_hash(filename)
+            cached = self._read(path)
+            st.rows = len(cached['frame']) if cached is not None else 0
+
+        if cached is not None and cached['csv_hash'] == csv_hash:
+            return cached['frame']
+
+        with stage(run, 'load_matches') as st:
+            df = load_matches(filename)
+            raw_columns = [c for c in df.columns if c != 'Target']
+            hashes = row_hashes(df, raw_columns)
+            st.rows = len(df)
+
+        start = 0
+        if cached is not None and cached['raw_columns'] == raw_columns:
+            start = self._first_changed_row(cached, df, hashes)
+
+        if start < len(df):
+            print(f"Feature store: recomputing {len(df) - start} of {len(df)} matches.")
+            with stage(run, 'lineups') as st:
+                lineups = load_lineups(filename, df)
+                st.rows = len(df)
+            # Form, Elo and player strength are timed as separate stages
+            frame = build_features(df, params, start=start, lineups=lineups, run=run)[store_columns(params)].iloc[start:]
+            if start > 0:
+                frame = categorize(pd.concat([cached['frame'].iloc[:start], frame], ignore_index=True))
+        else:
+            frame = cached['frame']
+
+        with stage(run, 'feature_cache_write') as st:
+            self._write(path, frame, csv_hash, hashes, raw_columns)
+            st.rows = len(frame)
+        return frame
+
+    @staticmethod
+    def _first_changed_row(cached, df, hashes):
+        """Index of the first new row dated on/after the earliest change."""
+        old_hashes = cached['row_hashes']
+        old_dates = cached['frame']['Date'].to_numpy()
+        new_dates = df['Date'].to_numpy()
+
+        n = min(len(old_hashes), len(hashes))
+        mismatch = np.flatnonzero(old_hashes[:n] != hashes[:n])
+        if mismatch.size:
+            i = mismatch[0]
+            changed_date = min(old_dates[i], new_dates[i])
+        elif len(hashes) > n:
+            changed_date = new_dates[n]
+        elif len(old_hashes) > n:
+            changed_date = old_dates[n]
+        else:
+            # Same rows, different bytes (e.g. reformatted file)
+            return len(df)
+        return int(np.searchsorted(new_dates, changed_date, side='left'))
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['__meta__']))
+            frame = pd.DataFrame({c: data[c] for c in meta['columns']})
+            hashes = data['__row_hashes__']
+        frame['Winner'] = frame['Winner'].replace('', np.nan)
+        categorize(frame)
+        return {'frame': frame, 'row_hashes': hashes, **meta}
+
+    def _write(self, path, frame, csv_hash, hashes, raw_columns):
+        os.makedirs(self.directory, exist_ok=True)
+        arrays = {}
+        for c in frame.columns:
+            col = frame[c]
+            if c in STRING_COLUMNS:
+                arrays[c] = col.astype(object).fillna('').astype(str).to_numpy(dtype=str)
+            else:
+                arrays[c] = col.to_numpy()
+        arrays['__row_hashes__'] = hashes
+        arrays['__meta__'] = np.array(json.dumps({'csv_hash': csv_hash, 'raw_columns': raw_columns, 'columns': list(frame.columns)}))
+
+        # Write then rename so a crash never leaves a half-written store
+        save_npz(path, arrays)
@@ -0,0 +1,99 @@
+import numpy as np
+from dataset import DATA_FILE, file_hash, read_matches
+from player_strength import PlayerStrengthEngine
+from form import compute_form, form_columns
+from ratings import TeamRatings, elo_columns
+from instrument import stage
+
+# Feature-engineering knobs (anything here changes the feature store key)
+FEATURE_PARAMS = {
+    'window': 5,         # Rolling form window (games)
+    'C': 5,              # Bayesian smoothing strength
+    'decay': 0.99,       # Player memory decay per appearance
+    'rest_default': 30,  # Rest days assumed before a team's first game
+    'extra_windows': [],  # Additional rolling form windows, e.g. [3, 10]
+    'ewm_alphas': [],     # Exponentially weighted form variants, e.g. [0.3]
+    'elo_k': 10,          # Elo update size (before the margin-of-victory multiplier)
+    'elo_home': 150,      # Elo points of home advantage (Top 14 home sides win ~70%)
+    'elo_glicko': False,  # Glicko-style rating deviation (adds H_Elo_RD/A_Elo_RD)
+}
+
+FEATURES = [
+    'H_Lineup_Strength', 'A_Lineup_Strength', 'Strength_Diff',
+    'H_Rest_Days', 'A_Rest_Days', 'Rest_Diff',
+    'H_Form_Points', 'A_Form_Points', 'Form_Point_Diff',
+    'H_Form_Diff', 'A_Form_Diff',
+    'H_Elo', 'A_Elo', 'Elo_Diff'
+]
+
+
+def feature_columns(params=FEATURE_PARAMS):
+    """FEATURES plus any extra form/rating variants requested in params."""
+    base = set(form_columns({'window': params['window']})) | set(FEATURES)
+    return FEATURES + [c for c in form_columns(params) + elo_columns(params) if c not in base]
+
+
+KEY_COLUMNS = ['Season', 'Phase', 'Date', 'Home_Team', 'Away_Team', 'Winner']
+
+
+def load_matches(filename=DATA_FILE, columns=None, seasons=None):
+    """
+    Scrape in chronological order (typed schema, see dataset.read_matches),
+    with the Target column added. `columns` projects the load but always
+    keeps the ones Target needs.
+    """
+    if columns is not None:
+        columns = list(columns) + ['Home_Team', 'Winner']
+    df = read_matches(filename, columns, seasons)
+
+    # Target: 1 if Home Wins, 0 otherwise (Handle NaN for future games)
+    df['Target'] = np.where(df['Winner'].notna(), (df['Winner'] == df['Home_Team']).astype(int), np.nan)
+    return df
+
+
+def build_features(df, params=FEATURE_PARAMS, start=0, lineups=None, strengths=None, run=None):
+    """
+    Adds the model features (see feature_columns) to the match frame returned by load_matches.
+    Only rows from `start` onward get player strengths; earlier rows are
+    replayed into player memory without being scored. Pass the cached
+    LineupMatrix as `lineups` to skip parsing the lineup strings, or
+    (home, away) lineup strengths computed elsewhere (e.g. from a player
+    memory shared across competitions) as `strengths` to skip the player pass.
+    Form, Elo and player strength are separate stages of `run` when given.
+    """
+    # ---------------------------------------------------------
+    # TEAM FORM FEATURES
+    # ---------------------------------------------------------
+
+    # Rest days and rolling/EWMA form, written straight into the match rows
+    with stage(run, 'form') as st:
+        df = df.assign(**compute_form(df, params))
+        st.rows = len(df)
+
+    # Pre-match Elo ratings: one O(1) update per finished game
+    with stage(run, 'elo') as st:
+        df = df.assign(**TeamRatings.from_params(params).run(df))
+        st.rows = len(df)
+
+    # ---------------------------------------------------------
+    # PLAYER STRENGTH
+    # ---------------------------------------------------------
+
+    # Chronological pass (one matchday at a time) to prevent data leakage
+    if strengths is None:
+        with stage(run, 'player_strength') as st:
+            engine = PlayerStrengthEngine(C=params['C'], global_mean=0.5, decay=params['decay'])
+            h_strength, a_strength, _ = engine.run(df, lineups=lineups, start=start)
+            st.rows = len(df) - start
+    else:
+        h_strength, a_strength = strengths
+
+    df['H_Lineup_Strength'] = h_strength
+    df['A_Lineup_Strength'] = a_strength
+
+    # Feature diffs usually correlate better than raw values
+    df['Strength_Diff'] = df['H_Lineup_Strength'] - df['A_Lineup_Strength']
+    df['Rest_Diff'] = df['H_Rest_Days'] - df['A_Rest_Days']
+    df['Form_Point_Diff'] = df['H_Form_Points'] - df['A_Form_Points']
+
+    return df
@@ -0,0 +1,148 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+METRICS = {'Points': 'Game_Points', 'Diff': 'Score_Diff'}
+
+
+def form_specs(params):
+    """
+    (column suffix, kind, argument) for every form variant the params ask for.
+    The main window keeps the historical column names (H_Form_Points, ...).
+    """
+    specs = [('', 'window', params['window'])]
+    specs += [(f'_w{w}', 'window', w) for w in params.get('extra_windows', [])]
+    specs += [(f'_ewm{a:g}', 'ewm', a) for a in params.get('ewm_alphas', [])]
+    return specs
+
+
+def form_columns(params):
+    return [f'{side}_Form_{m}{suffix}' for suffix, _, _ in form_specs(params) for m in METRICS for side in ('H', 'A')]
+
+
+def game_results(score, opp):
+    # Points allocation: Win=1, Draw=0.5, Loss=0
+    points = np.select([score > opp, score == opp], [1.0, 0.5], default=0.0)
+    return points, score - opp
+
+
+def compute_form(df, params):
+    """
+    Rest days and every form variant for each match of df (chronological),
+    computed in one pass over a per-team timeline and written back by row
+    position: no groupby lambdas, no merges.
+    """
+    n = len(df)
+    teams, _ = pd.factorize(np.concatenate([df['Home_Team'].to_numpy(dtype=object), df['Away_Team'].to_numpy(dtype=object)]))
+    dates = np.concatenate([df['Date'].to_numpy()] * 2)
+    score = np.concatenate([df['Home_Score'], df['Away_Score']]).astype(float)
+    opp = np.concatenate([df['Away_Score'], df['Home_Score']]).astype(float)
+    points, diff = game_results(score, opp)
+    # Unplayed fixtures (0-0 placeholders with no Winner) are not results
+    finished = np.concatenate([df['Winner'].notna().to_numpy()] * 2)
+    values = {'Points': np.where(finished, points, np.nan), 'Diff': np.where(finished, diff, np.nan)}
+
+    # Single timeline per team: home entries are 0..n-1, away entries n..2n-1
+    order = np.lexsort((np.arange(2 * n), dates, teams))
+    teams_s = teams[order]
+    new_team = np.r_[True, teams_s[1:] != teams_s[:-1]]
+    pos = np.arange(2 * n)
+    group_start = np.maximum.accumulate(np.where(new_team, pos, 0))
+
+    out = {}
+
+    # Days since last match (default for a team's first game)
+    dates_s = dates[order]
+    rest = np.empty(2 * n)
+    rest[1:] = (dates_s[1:] - dates_s[:-1]) / np.timedelta64(1, 'D')
+    rest[new_team] = params['rest_default']
+    out['Rest_Days'] = rest
+
+    for suffix, kind, arg in form_specs(params):
+        for m, v in values.items():
+            v_s = v[order]
+            if kind == 'window':
+                out[f'Form_{m}{suffix}'] = _shifted_rolling_mean(v_s, pos, group_start, arg)
+            else:
+                out[f'Form_{m}{suffix}'] = _shifted_ewm(v_s, pos, group_start, arg)
+
+    # Scatter back to match rows
+    columns = {}
+    for name, sorted_vals in out.items():
+        unsorted = np.empty(2 * n)
+        unsorted[order] = sorted_vals
+        columns[f'H_{name}'] = unsorted[:n]
+        columns[f'A_{name}'] = unsorted[n:]
+    return columns
+
+
+def _shifted_rolling_mean(v, pos, group_start, window):
+    """Mean of the previous `window` valid (non-NaN) values in the group (0 if none)."""
+    valid = ~np.isnan(v)
+    counts = np.r_[0, np.cumsum(valid)]
+    sums = np.r_[0.0, np.cumsum(v[valid])]
+    # Valid values before each position, and where the group's last `window` of them start
+    before = counts[pos]
+    lo = np.maximum(counts[group_start], before - window)
+    count = before - lo
+    return np.divide(sums[before] - sums[lo], count, out=np.zeros(len(v)), where=count > 0)
+
+
+def _shifted_ewm(v, pos, group_start, alpha):
+    """
+    Exponentially weighted mean (pandas adjust=True) of the previous valid
+    values in the group. NaNs are skipped entirely (no decay), like TeamForm.
+    """
+    valid = ~np.isnan(v)
+    counts = np.r_[0, np.cumsum(valid)]
+    out = np.zeros(len(v))
+    a = [1.0, -(1.0 - alpha)]
+    starts = np.flatnonzero(pos == group_start)
+    ends = np.r_[starts[1:], len(v)]
+    for s, e in zip(starts, ends):
+        x = v[s:e][valid[s:e]]
+        if len(x) == 0:
+            continue
+        # Mean after each valid value, then looked up by how many came before each position
+        mean = lfilter([1.0], a, x) / lfilter([1.0], a, np.ones(len(x)))
+        k = counts[s:e] - counts[s]
+        out[s:e] = np.where(k > 0, mean[np.maximum(k - 1, 0)], 0.0)
+    return out
+
+
+class TeamForm:
+    """
+    Incremental counterpart of compute_form for a single team: a ring buffer
+    of recent results plus running EWMA sums, updated in O(1) per match.
+    """
+
+    def __init__(self, params):
+        self.specs = form_specs(params)
+        self.alphas = [arg for _, kind, arg in self.specs if kind == 'ewm']
+        self.results = deque(maxlen=max(arg for _, kind, arg in self.specs if kind == 'window'))
+        self.ewm = np.zeros((len(self.alphas), 3))  # per alpha: Points num, Diff num, weight
+        self.last_date = None
+
+    def push(self, date, points, diff):
+        self.results.append((points, diff))
+        for i, alpha in enumerate(self.alphas):
+            self.ewm[i] = self.ewm[i] * (1.0 - alpha) + (points, diff, 1.0)
+        self.last_date = date
+
+    def values(self):
+        """Form_* values for this team's next match."""
+        out = {}
+        recent = list(self.results)
+        ewm_i = 0
+        for suffix, kind, arg in self.specs:
+            if kind == 'window':
+                last = recent[-arg:]
+                out[f'Form_Points{suffix}'] = np.mean([r[0] for r in last]) if last else 0.0
+                out[f'Form_Diff{suffix}'] = np.mean([r[1] for r in last]) if last else 0.0
+            else:
+                num_pts, num_diff, weight = self.ewm[ewm_i]
+                out[f'Form_Points{suffix}'] = num_pts / weight if weight > 0 else 0.0
+                out[f'Form_Diff{suffix}'] = num_diff / weight if weight > 0 else 0.0
+                ewm_i += 1
+        return out
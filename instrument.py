@@ -0,0 +1,178 @@
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+REPORT_FILE = 'run_report.json'
+PROFILE_TOP = 15  # Functions kept per stage in the report when profiling
+
+
+def max_rss_mb():
+    """Peak resident set size of this process so far."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 1024
+
+
+def _proc_status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def reset_peak_rss():
+    """
+    Resets the kernel's RSS high-water mark (Linux only), so VmHWM measures
+    from now on. Returns VmHWM just after the reset in MB (the baseline to
+    subtract later: VmRSS read separately can sit above it by a few pages),
+    or None where unsupported.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return _proc_status_mb('VmHWM')
+    except OSError:
+        return None
+
+
+class Stage:
+    """Measurements for one named stage. Set `rows` (and anything in `extra`) inside the with-block."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = None
+        self.peak_mb = None
+        self.max_rss_mb = None
+        self.rows = None
+        self.extra = {}
+        self.profile = None
+
+    def to_dict(self):
+        out = {'name': self.name, 'seconds': round(self.seconds, 4), 'rows': self.rows,
+               'peak_mb': None if self.peak_mb is None else round(self.peak_mb, 2),
+               'max_rss_mb': round(self.max_rss_mb, 1), **self.extra}
+        if self.profile is not None:
+            out['profile'] = self.profile
+        return out
+
+
+class RunReport:
+    """
+    Named stages of one run with their wall time, row count, peak memory on
+    top of what was in use when the stage started, and the process's peak
+    RSS so far.
+
+    memory='rss' (default) reads the kernel's RSS high-water mark, reset at
+    each stage start: free to collect, but Linux only (None elsewhere) and
+    page-granular. memory='traced' uses tracemalloc, which is exact for
+    Python/NumPy allocations but slows allocation-heavy stages several times
+    over. memory=None skips it. With profile=True each stage also runs under
+    cProfile; its top functions go in the report and all stages are
+    combined into one .prof file (open with pstats or snakeviz).
+    """
+
+    def __init__(self, name, memory='rss', profile=False, verbose=True):
+        if memory not in ('rss', 'traced', None):
+            raise ValueError(f"memory must be 'rss', 'traced' or None, not {memory!r}")
+        self.name = name
+        self.memory = memory
+        self.profile = profile
+        self.verbose = verbose
+        self.stages = []
+        self.profiles = []
+        self.started = datetime.now()
+        self.start = time.perf_counter()
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        stage = Stage(name)
+        traced = self.memory == 'traced'
+        tracing = traced and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if traced:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        elif self.memory == 'rss':
+            base = reset_peak_rss()
+        profiler = cProfile.Profile() if self.profile else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield stage
+        finally:
+            if profiler:
+                profiler.disable()
+            stage.seconds = time.perf_counter() - start
+            if traced:
+                stage.peak_mb = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+            elif self.memory == 'rss' and base is not None:
+                stage.peak_mb = max(0.0, _proc_status_mb('VmHWM') - base)
+            if tracing:
+                tracemalloc.stop()
+            stage.max_rss_mb = max_rss_mb()
+            if profiler:
+                self.profiles.append(profiler)
+                stage.profile = top_functions(profiler)
+            self.stages.append(stage)
+            if self.verbose:
+                rows = f", {stage.rows} rows" if stage.rows is not None else ""
+                memory = f", peak {stage.peak_mb:.1f} MB" if stage.peak_mb is not None else ""
+                print(f"[stage] {name}: {stage.seconds:.2f}s{memory}{rows}")
+
+    def to_dict(self):
+        return {
+            'run': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'total_seconds': round(time.perf_counter() - self.start, 4),
+            'python': platform.python_version(),
+            'memory': self.memory,
+            **self.info,
+            'stages': [s.to_dict() for s in self.stages],
+        }
+
+    def write(self, path):
+        """Writes the JSON report (and <report>.prof when profiling). Returns the report dict."""
+        report = self.to_dict()
+        if self.profiles:
+            prof_path = os.path.splitext(path)[0] + '.prof'
+            stats = pstats.Stats(self.profiles[0])
+            for p in self.profiles[1:]:
+                stats.add(p)
+            stats.dump_stats(prof_path)
+            report['profile_file'] = prof_path
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        return report
+
+
+def stage(run, name):
+    """run.stage(name), or a bare Stage when run is None, so callers instrument unconditionally."""
+    return run.stage(name) if run is not None else nullcontext(Stage(name))
+
+
+def top_functions(profiler, n=PROFILE_TOP):
+    """The n functions with the most cumulative time: [{function, calls, cumulative_s, own_s}]."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({func})", 'calls': calls,
+                     'cumulative_s': round(cumulative, 4), 'own_s': round(own, 4)})
+    return sorted(rows, key=lambda r: -r['cumulative_s'])[:n]
+
+
+def report_path(output):
+    """Run report path next to an output file (e.g. final_predictions.csv)."""
+    return os.path.join(os.path.dirname(output), REPORT_FILE)
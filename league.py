@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from competitions import COMPETITIONS
+from features import FEATURE_PARAMS, build_features, feature_columns, load_matches
+from instrument import RunReport, report_path, stage
+from models import BACKENDS, MODEL_BACKEND
+from player_strength import PlayerStrengthEngine
+from predictor import BACKTEST_END, BACKTEST_START, report, train_and_score
+
+OUTPUT_DIR = 'predictions'
+
+# A match listed by two competitions (the Top 14 / Pro D2 access match) is the same game
+MATCH_KEY = ['Date', 'Home_Team', 'Away_Team']
+
+
+def shared_player_strengths(frames, params=FEATURE_PARAMS):
+    """
+    One player memory across competitions. frames: {competition: load_matches
+    frame}. All matches go through a single chronological pass with one
+    PlayerIndex, so a player keeps their rating when they move league (e.g. a
+    Pro D2 side promoted through the access match). A game listed by two
+    competitions counts once. Returns {competition: (home, away) strengths}
+    aligned with each frame, ready for build_features(strengths=...).
+    """
+    parts = []
+    for key, df in frames.items():
+        part = df[MATCH_KEY + ['Winner', 'Home_Score', 'Away_Score', 'Home_Lineup', 'Away_Lineup']].copy()
+        for c in ['Home_Team', 'Away_Team', 'Winner']:
+            part[c] = part[c].astype(object)
+        part['competition'] = key
+        part['row'] = np.arange(len(part))
+        parts.append(part)
+    merged = pd.concat(parts, ignore_index=True).sort_values('Date', kind='stable').reset_index(drop=True)
+    match_id = merged.groupby(MATCH_KEY, sort=False).ngroup().to_numpy()
+    first = ~merged.duplicated(MATCH_KEY).to_numpy()
+
+    engine = PlayerStrengthEngine(C=params['C'], global_mean=0.5, decay=params['decay'])
+    h, a, index = engine.run(merged[first].reset_index(drop=True))
+    h_by_match = np.empty(match_id.max() + 1)
+    a_by_match = np.empty(match_id.max() + 1)
+    h_by_match[match_id[first]] = h
+    a_by_match[match_id[first]] = a
+    print(f"Shared player memory: {len(index)} players over {first.sum()} matches "
+          f"({len(merged) - first.sum()} listed by two competitions).")
+
+    out = {}
+    for key, df in frames.items():
+        mine = (merged['competition'] == key).to_numpy()
+        order = np.argsort(merged['row'].to_numpy()[mine])
+        ids = match_id[mine][order]
+        out[key] = (h_by_match[ids], a_by_match[ids])
+    return out
+
+
+def available_competitions():
+    """Competitions whose scrape CSV exists, in registry order."""
+    return [k for k, c in COMPETITIONS.items() if os.path.exists(c['data_file'])]
+
+
+def run_competition(args):
+    """
+    Feature build, training and prediction for one competition (run in its
+    own process). Console output goes to <output_dir>/run.log; predictions
+    and run_report.json sit next to it.
+    """
+    key, strengths, params, backend, output_dir, profile = args
+    os.makedirs(output_dir, exist_ok=True)
+    output = os.path.join(output_dir, 'final_predictions.csv')
+    start = time.perf_counter()
+    with open(os.path.join(output_dir, 'run.log'), 'w') as log, contextlib.redirect_stdout(log):
+        run = RunReport(key, profile=profile)
+        run.info.update({'competition': key, 'backend': backend, 'feature_params': params})
+        with stage(run, 'load_matches') as st:
+            df = load_matches(COMPETITIONS[key]['data_file'])
+            st.rows = len(df)
+        frame = build_features(df, params, strengths=strengths, run=run)
+        results = train_and_score(frame, feature_columns(params), BACKTEST_START, BACKTEST_END, backend, run)
+        if results is not None:
+            with stage(run, 'report') as st:
+                report(results, output)
+                st.rows = len(results)
+        run.write(report_path(output))
+
+    return {
+        'competition': key,
+        'matches': len(df),
+        'fixtures': 0 if results is None else len(results),
+        'seconds': round(time.perf_counter() - start, 2),
+        'output': output if results is not None else None,
+    }
+
+
+def run_competitions(keys, params=FEATURE_PARAMS, backend=MODEL_BACKEND, workers=None, output_dir=OUTPUT_DIR,
+                     profile=False):
+    """Shared player pass in this process, then one process per competition. Returns one summary row each."""
+    missing = [k for k in keys if not os.path.exists(COMPETITIONS[k]['data_file'])]
+    if missing:
+        raise FileNotFoundError(f"No data for {', '.join(missing)}: run 'python scrape.py --competition <name>' first.")
+
+    frames = {k: load_matches(COMPETITIONS[k]['data_file'],
+                              ['Date', 'Away_Team', 'Home_Score', 'Away_Score', 'lineups']) for k in keys}
+    strengths = shared_player_strengths(frames, params)
+    del frames
+
+    jobs = [(k, strengths[k], params, backend, os.path.join(output_dir, k), profile) for k in keys]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    print(f"Running {len(jobs)} competition(s) on {workers} process(es)...")
+    if workers == 1:
+        return [run_competition(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_competition, jobs))
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and predict several competitions in parallel, "
+                                                 "with one player-rating memory shared between them.")
+    parser.add_argument('--competitions', nargs='*', default=None, choices=list(COMPETITIONS),
+                        help="Default: every competition whose CSV has been scraped")
+    parser.add_argument('--backend', default=MODEL_BACKEND, choices=list(BACKENDS))
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: one per competition, up to the CPU count)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Per-competition outputs go in <output-dir>/<competition>/")
+    parser.add_argument('--profile', action='store_true', help="cProfile every stage (run_report.prof per competition)")
+    args = parser.parse_args()
+
+    keys = args.competitions or available_competitions()
+    if not keys:
+        sys.exit("No competition data found: run 'python scrape.py --competition <name>' first.")
+
+    start = time.perf_counter()
+    try:
+        summary = run_competitions(keys, backend=args.backend, workers=args.workers,
+                                   output_dir=args.output_dir, profile=args.profile)
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+    print(pd.DataFrame(summary).to_string(index=False))
+    print(f"\nDone in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,97 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import lsqr
+from dataset import save_npz
+from features import file_hash, load_matches
+from player_strength import PlayerIndex
+
+
+class LineupMatrix:
+    """
+    Lineups of every match, parsed once into a player dictionary plus CSR
+    arrays: home lineup i owns home_ids[home_indptr[i]:home_indptr[i+1]]
+    (same for away). Rows follow load_matches order.
+    """
+
+    def __init__(self, index, home, away):
+        self.index = index
+        self.home = home  # (ids, indptr, present)
+        self.away = away
+
+    def __len__(self):
+        return len(self.home[2])
+
+    @classmethod
+    def from_frame(cls, df, index=None):
+        index = index if index is not None else PlayerIndex()
+        home = index.parse(df['Home_Lineup'])
+        away = index.parse(df['Away_Lineup'])
+        return cls(index, home, away)
+
+    def sparse(self, side):
+        """Match-by-player 0/1 matrix for 'home' or 'away'."""
+        ids, indptr, _ = self.home if side == 'home' else self.away
+        return sp.csr_matrix((np.ones(len(ids)), ids, indptr), shape=(len(self), len(self.index)))
+
+    def signed(self):
+        """Match-by-player matrix with home players at +1 and away players at -1."""
+        return (self.sparse('home') - self.sparse('away')).tocsr()
+
+    # ---------------------------------------------------------
+    # CACHE (next to the CSV)
+    # ---------------------------------------------------------
+
+    def save(self, path, csv_hash):
+        arrays = {'players': np.array(self.index.names, dtype=str), 'csv_hash': np.array(csv_hash)}
+        for side, (ids, indptr, present) in (('home', self.home), ('away', self.away)):
+            arrays[f'{side}_ids'] = ids
+            arrays[f'{side}_indptr'] = indptr
+            arrays[f'{side}_present'] = present
+        save_npz(path, arrays)
+
+    @classmethod
+    def load(cls, path, csv_hash):
+        """Cached matrix, or None if missing or built from another version of the CSV."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['csv_hash']) != csv_hash:
+                return None
+            index = PlayerIndex.from_names(data['players'].tolist())
+            home = (data['home_ids'], data['home_indptr'], data['home_present'])
+            away = (data['away_ids'], data['away_indptr'], data['away_present'])
+        return cls(index, home, away)
+
+
+def cache_path(filename):
+    root, _ = os.path.splitext(filename)
+    return f"{root}.lineups.npz"
+
+
+def load_lineups(filename, df=None):
+    """
+    LineupMatrix for the matches of `filename` (in load_matches order),
+    parsed from the strings only when the CSV changed since the last call.
+    """
+    csv_hash = file_hash(filename)
+    path = cache_path(filename)
+    lineups = LineupMatrix.load(path, csv_hash)
+    if lineups is None:
+        df = load_matches(filename) if df is None else df
+        lineups = LineupMatrix.from_frame(df)
+        lineups.save(path, csv_hash)
+    return lineups
+
+
+def ridge_plus_minus(lineups, margin, rows=None, alpha=10.0):
+    """
+    Regularized plus/minus: solves signed_lineups @ ratings ~= margin with an
+    L2 penalty in a single sparse least-squares call. Returns one rating per
+    player ID (points of margin per match played).
+    """
+    X = lineups.signed()
+    if rows is not None:
+        X = X[rows]
+        margin = np.asarray(margin)[rows]
+    return lsqr(X, np.asarray(margin, dtype=float), damp=np.sqrt(alpha))[0]
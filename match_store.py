@@ -0,0 +1,158 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    season     TEXT NOT NULL,
+    phase      TEXT NOT NULL,
+    home_team  TEXT NOT NULL,
+    away_team  TEXT,
+    date       TEXT,
+    winner     TEXT,
+    url        TEXT,
+    data       TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    PRIMARY KEY (season, phase, home_team)
+);
+CREATE INDEX IF NOT EXISTS matches_date ON matches (date);
+CREATE INDEX IF NOT EXISTS matches_url ON matches (url);
+"""
+
+# Only write when something changed, so re-scraping a final match is a no-op
+UPSERT = """
+INSERT INTO matches (season, phase, home_team, away_team, date, winner, url, data, scraped_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (season, phase, home_team) DO UPDATE SET
+    away_team = excluded.away_team,
+    date = excluded.date,
+    winner = excluded.winner,
+    url = COALESCE(excluded.url, matches.url),
+    data = excluded.data,
+    scraped_at = excluded.scraped_at
+WHERE matches.data != excluded.data OR matches.url IS NOT excluded.url
+"""
+
+
+def store_path(filename):
+    root, _ = os.path.splitext(filename)
+    return f"{root}.sqlite"
+
+
+def _iso_date(text):
+    try:
+        return datetime.strptime(text, "%d/%m/%Y").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def slugify(text):
+    """URL slug as lnr.fr builds them: 'Union Bordeaux-Bègles' -> 'union-bordeaux-begles'."""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', ascii_text.lower()).strip('-')
+
+
+def _url_names_pair(url, home_team, away_team):
+    """True if a path segment of the match URL ends with the home then away team slugs."""
+    pair = f"{slugify(home_team)}-{slugify(away_team)}"
+    return any(seg == pair or seg.endswith('-' + pair) for seg in url.split('?')[0].rstrip('/').split('/'))
+
+
+class MatchStore:
+    """
+    Scraped matches in SQLite, one row per (Season, Phase, Home_Team) like
+    the CSV dedup key. Every upsert commits on its own, so a crash only
+    loses the match being scraped. The full scrape row is kept as JSON; key,
+    date, winner and match URL get their own indexed columns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.changes = 0
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _params(row, url):
+        winner = row.get('Winner')
+        return (row['Season'], row['Phase'], row['Home_Team'], row.get('Away_Team'),
+                _iso_date(row.get('Date')), winner if isinstance(winner, str) else None,
+                url, json.dumps(row, ensure_ascii=False), time.time())
+
+    def upsert(self, row, url=None):
+        """Inserts or updates one scraped row and commits. Returns True if it changed anything."""
+        with self.lock:
+            changed = self.conn.execute(UPSERT, self._params(row, url)).rowcount > 0
+            self.conn.commit()
+            self.changes += changed
+        return changed
+
+    def upsert_many(self, rows):
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany(UPSERT, (self._params(r, None) for r in rows))
+            self.conn.commit()
+            self.changes += self.conn.total_changes - before
+
+    def is_final(self, url, season=None, phase=None):
+        """
+        True if the match at `url` is stored with a result. Rows seeded from
+        the CSV have no URL yet: given the season and phase, a finished row
+        without one whose teams the URL slug names is taken as this match,
+        and the URL is saved on it so later checks hit the index directly.
+        """
+        with self.lock:
+            found = self.conn.execute("SELECT 1 FROM matches WHERE url = ? AND winner IS NOT NULL LIMIT 1", (url,)).fetchone()
+            if found is not None or season is None:
+                return found is not None
+            seeded = self.conn.execute(
+                "SELECT home_team, away_team FROM matches WHERE season = ? AND phase = ? AND url IS NULL "
+                "AND winner IS NOT NULL AND away_team IS NOT NULL", (season, phase)).fetchall()
+            for home_team, away_team in seeded:
+                if _url_names_pair(url, home_team, away_team):
+                    self.conn.execute("UPDATE matches SET url = ? WHERE season = ? AND phase = ? AND home_team = ?",
+                                      (url, season, phase, home_team))
+                    self.conn.commit()
+                    return True
+        return False
+
+    def finished_counts(self):
+        """{(season, phase): number of matches with a result}."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT season, phase, COUNT(*) FROM matches WHERE winner IS NOT NULL GROUP BY season, phase").fetchall()
+        return {(s, p): n for s, p, n in rows}
+
+    # ---------------------------------------------------------
+    # CSV IMPORT / EXPORT (export lives in scrape.py)
+    # ---------------------------------------------------------
+
+    def import_csv(self, filename):
+        """Loads an existing scrape CSV (as text, so the export round-trips it unchanged)."""
+        df = pd.read_csv(filename, dtype=str)
+        rows = df.astype(object).where(df.notna(), None).to_dict('records')
+        self.upsert_many(rows)
+        return len(rows)
+
+    def to_frame(self):
+        """All stored rows in insertion order."""
+        with self.lock:
+            data = self.conn.execute("SELECT data FROM matches ORDER BY rowid").fetchall()
+        return pd.DataFrame([json.loads(d) for d, in data])
+
@@ -0,0 +1,202 @@
+import argparse
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Random Forest settings shared by every training path
+MODEL_PARAMS = {'n_estimators': 300, 'max_depth': 10, 'min_samples_leaf': 3, 'random_state': 1}
+
+# Model used by retrain/backtest unless told otherwise
+MODEL_BACKEND = 'forest'
+
+
+def _logistic(**params):
+    # Features are on very different scales (Elo ~1500, rest days, win rates)
+    return make_pipeline(StandardScaler(), LogisticRegression(**params))
+
+
+# Backends that fit/predict on a thread pool (n_jobs)
+THREADED = {'forest'}
+
+# name -> (constructor, default parameters)
+BACKENDS = {
+    'forest': (RandomForestClassifier, MODEL_PARAMS),
+    'hgb': (HistGradientBoostingClassifier, {'max_iter': 200, 'learning_rate': 0.05, 'max_leaf_nodes': 15,
+                                             'min_samples_leaf': 20, 'l2_regularization': 1.0,
+                                             'early_stopping': False, 'random_state': 1}),
+    'logistic': (_logistic, {'C': 0.5, 'max_iter': 1000}),
+}
+
+
+def make_model(backend=MODEL_BACKEND, **overrides):
+    """
+    Unfitted classifier for `backend` (see BACKENDS) with its defaults
+    updated by `overrides`. n_jobs is dropped for models that aren't THREADED.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r} (choose from {', '.join(BACKENDS)})")
+    factory, defaults = BACKENDS[backend]
+    params = {**defaults, **overrides}
+    if backend not in THREADED:
+        params.pop('n_jobs', None)
+    return factory(**params)
+
+
+def model_params(backend=MODEL_BACKEND, **overrides):
+    return {**BACKENDS[backend][1], **overrides}
+
+
+def home_win_probability(clf, X):
+    """P(home win) for each row of X from one pass over the model (no separate predict call)."""
+    return clf.predict_proba(X)[:, list(clf.classes_).index(1)]
+
+
+class FlatForest:
+    """
+    A fitted RandomForestClassifier flattened into a few NumPy arrays (every
+    tree's nodes back to back). Inference moves all rows through all trees
+    one level at a time, so a batch costs max_depth vectorised steps and a
+    single row skips sklearn's per-call validation and thread dispatch.
+    Gives the same probabilities as the forest and can stand in for it
+    wherever predict_proba is called.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_forest(cls, forest):
+        if list(forest.classes_) != [0, 1]:
+            raise ValueError("FlatForest only supports binary 0/1 targets")
+        parts = {k: [] for k in ('feature', 'threshold', 'left', 'right', 'missing_left', 'value')}
+        roots, offset, depth = [], 0, 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            nodes = np.arange(n)
+            # Leaves point at themselves so extra steps are no-ops
+            parts['left'].append(np.where(leaf, nodes, tree.children_left) + offset)
+            parts['right'].append(np.where(leaf, nodes, tree.children_right) + offset)
+            parts['feature'].append(np.where(leaf, 0, tree.feature))
+            parts['threshold'].append(tree.threshold)
+            parts['missing_left'].append(tree.missing_go_to_left.astype(bool) if hasattr(tree, 'missing_go_to_left')
+                                         else np.zeros(n, dtype=bool))
+            counts = tree.value[:, 0, :]
+            parts['value'].append(counts[:, 1] / counts.sum(axis=1))
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+        return cls(feature=np.concatenate(parts['feature']).astype(np.int32),
+                   threshold=np.concatenate(parts['threshold']),
+                   left=np.concatenate(parts['left']).astype(np.int32),
+                   right=np.concatenate(parts['right']).astype(np.int32),
+                   missing_left=np.concatenate(parts['missing_left']),
+                   value=np.concatenate(parts['value']),
+                   roots=np.array(roots, dtype=np.int32), depth=depth,
+                   classes=np.array([0, 1]), n_features=forest.n_features_in_)
+
+    def predict_proba(self, X):
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        p = self.value[node].mean(axis=1)
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(np.int64)
+
+
+def compile_model(clf):
+    """FlatForest for a fitted random forest; any other model is returned as is."""
+    return FlatForest.from_forest(clf) if isinstance(clf, RandomForestClassifier) else clf
+
+
+def benchmark(backends, train, test, features, single_rows=200):
+    """
+    Fits each backend on `train` and scores `test`. 'flat' is the forest
+    exported to FlatForest. Reports fit time, batch and single-row latency
+    per row, accuracy, log-loss and pickled size.
+    """
+    X_train, y_train = train[features].to_numpy(dtype=np.float64), train['Target'].to_numpy(dtype=np.int64)
+    X_test, y_test = test[features].to_numpy(dtype=np.float64), test['Target'].to_numpy(dtype=np.int64)
+    singles = X_test[:single_rows]
+
+    rows, forest = [], None
+    for name in backends:
+        start = time.perf_counter()
+        if name == 'flat':
+            if forest is None:
+                forest = make_model('forest', n_jobs=1).fit(X_train, y_train)
+            clf = compile_model(forest)
+        else:
+            clf = make_model(name, n_jobs=1).fit(X_train, y_train)
+            if name == 'forest':
+                forest = clf
+        fit_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        probs = home_win_probability(clf, X_test)
+        batch_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for x in singles:
+            home_win_probability(clf, x[None, :])
+        single_s = time.perf_counter() - start
+
+        rows.append({
+            'Backend': name,
+            'Fit_Seconds': fit_s,
+            'Batch_us_per_row': batch_s / len(X_test) * 1e6,
+            'Single_row_ms': single_s / len(singles) * 1000,
+            'Accuracy': accuracy_score(y_test, probs > 0.5),
+            'Log_Loss': log_loss(y_test, probs, labels=[0, 1]),
+            'Size_KB': len(pickle.dumps(clf)) / 1024,
+        })
+    return pd.DataFrame(rows)
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    from features import DATA_FILE, FEATURE_PARAMS, feature_columns
+    from feature_store import FeatureStore
+
+    parser = argparse.ArgumentParser(description="Compare model backends on a held-out season.")
+    parser.add_argument('--backends', nargs='*', default=[*BACKENDS, 'flat'], choices=[*BACKENDS, 'flat'])
+    parser.add_argument('--test-season', help="Season to hold out (default: the latest with results)")
+    parser.add_argument('--csv', default=DATA_FILE)
+    args = parser.parse_args()
+
+    features = feature_columns(FEATURE_PARAMS)
+    df = FeatureStore().load(args.csv, FEATURE_PARAMS)
+    df = df[df['Winner'].notna()].dropna(subset=features)
+    season = args.test_season or df['Season'].iloc[-1]
+    test = df[df['Season'] == season]
+    train = df[df['Date'] < test['Date'].min()]
+    print(f"Training on {len(train)} games before {season}, testing on its {len(test)} games.")
+
+    results = benchmark(args.backends, train, test, features)
+    pd.set_option('display.width', 1000)
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
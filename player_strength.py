@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+
+
+class PlayerIndex:
+    """Interns player names to integer IDs so ratings can live in flat arrays."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        pid = self.ids.get(name)
+        if pid is None:
+            pid = len(self.names)
+            self.ids[name] = pid
+            self.names.append(name)
+        return pid
+
+    def parse(self, lineups):
+        """
+        Splits a column of comma-joined lineup strings once.
+        Returns (ids, offsets, present): lineup i owns ids[offsets[i]:offsets[i+1]],
+        present[i] is False where the lineup was missing (NaN).
+        """
+        ids = []
+        offsets = [0]
+        present = []
+        for lineup_str in lineups:
+            if pd.isna(lineup_str):
+                present.append(False)
+            else:
+                present.append(True)
+                ids.extend(self.intern(p.strip()) for p in str(lineup_str).split(','))
+            offsets.append(len(ids))
+        return np.array(ids, dtype=np.int64), np.array(offsets, dtype=np.int64), np.array(present, dtype=bool)
+
+    @classmethod
+    def from_names(cls, names):
+        index = cls()
+        index.names = list(names)
+        index.ids = {name: pid for pid, name in enumerate(index.names)}
+        return index
+
+    def lookup(self, lineups):
+        """
+        Same as parse, but without adding names: unknown players map to
+        len(self), a slot the engine keeps at zero (i.e. the global mean).
+        Lineups may also be given as lists of names.
+        """
+        unknown = len(self.names)
+        ids = []
+        offsets = [0]
+        present = []
+        for lineup in lineups:
+            if isinstance(lineup, (list, tuple)):
+                present.append(True)
+                ids.extend(self.ids.get(p.strip(), unknown) for p in lineup)
+            elif pd.isna(lineup):
+                present.append(False)
+            else:
+                present.append(True)
+                ids.extend(self.ids.get(p.strip(), unknown) for p in str(lineup).split(','))
+            offsets.append(len(ids))
+        return np.array(ids, dtype=np.int64), np.array(offsets, dtype=np.int64), np.array(present, dtype=bool)
+
+
+class PlayerStrengthEngine:
+    """
+    Array-backed version of the Bayesian "Player Strength" memory.
+
+    sum_pts/games are stored per player ID. Ratings only decay when a player
+    plays (s = s * decay + points), so an update touches just the lineup's
+    slice of the arrays and players who sit out are never visited.
+    """
+
+    def __init__(self, C=5, global_mean=0.5, decay=0.99, capacity=1024):
+        self.C = C
+        self.global_mean = global_mean
+        self.decay = decay
+        self.sum_pts = np.zeros(capacity)
+        self.games = np.zeros(capacity)
+
+    def reserve(self, n_players):
+        if n_players <= len(self.sum_pts):
+            return
+        size = max(n_players, 2 * len(self.sum_pts))
+        self.sum_pts = np.concatenate([self.sum_pts, np.zeros(size - len(self.sum_pts))])
+        self.games = np.concatenate([self.games, np.zeros(size - len(self.games))])
+
+    def smoothed(self, ids):
+        # Bayesian Average
+        return (self.sum_pts[ids] + (self.C * self.global_mean)) / (self.games[ids] + self.C)
+
+    def strength(self, ids, offsets, present):
+        """Mean smoothed score of every lineup in the (ids, offsets) slice."""
+        out = np.full(len(present), self.global_mean)
+        counts = np.diff(offsets)
+        filled = present & (counts > 0)
+        if ids.size and filled.any():
+            starts = offsets[:-1][filled] - offsets[0]
+            sums = np.add.reduceat(self.smoothed(ids), starts)
+            out[filled] = sums / counts[filled]
+        return out
+
+    def update(self, ids, points):
+        """
+        Applies one appearance per entry of ids, in order.
+        A player listed twice is decayed twice, exactly like the sequential loop.
+        """
+        if ids.size == 0:
+            return
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        first = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(ids)), 0))
+        rank = np.empty(len(ids), dtype=np.int64)
+        rank[order] = np.arange(len(ids)) - group_start
+
+        # Each "layer" holds at most one occurrence per player, so fancy indexing is safe
+        for r in range(rank.max() + 1):
+            layer = rank == r
+            p = ids[layer]
+            self.sum_pts[p] = self.sum_pts[p] * self.decay + points[layer]
+            self.games[p] = self.games[p] * self.decay + 1
+
+    def run(self, df, lineups=None, start=0):
+        """
+        Walks df (already in chronological order) one matchday at a time.
+        Returns (home_strength, away_strength) for every row, each computed
+        from games strictly before it, plus the PlayerIndex used.
+
+        `lineups` is a pre-parsed LineupMatrix aligned with df; without one
+        the lineup strings are parsed here.
+
+        Rows before `start` only feed player memory (their strengths are NaN),
+        which is a single vectorized update since nothing is read in between.
+        """
+        if lineups is None:
+            index = PlayerIndex()
+            h_ids, h_off, h_present = index.parse(df['Home_Lineup'])
+            a_ids, a_off, a_present = index.parse(df['Away_Lineup'])
+        else:
+            index = lineups.index
+            h_ids, h_off, h_present = lineups.home
+            a_ids, a_off, a_present = lineups.away
+        self.reserve(len(index))
+
+        h_pts, a_pts = match_points(df)
+        finished = df['Winner'].notna().to_numpy()
+
+        h_strength = np.full(len(df), np.nan)
+        a_strength = np.full(len(df), np.nan)
+
+        if start > 0:
+            self.update(*self.appearances(h_ids, h_off, a_ids, a_off, h_pts, a_pts, finished, 0, start))
+
+        dates = df['Date'].to_numpy()
+        day_starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+        day_starts = np.r_[start, day_starts[day_starts > start]] if start < len(df) else day_starts[:0]
+        day_ends = np.r_[day_starts[1:], len(df)]
+
+        for day_start, day_end in zip(day_starts, day_ends):
+            for lo, hi in _conflict_free_chunks(h_ids, h_off, a_ids, a_off, finished, day_start, day_end):
+                h_slice = h_ids[h_off[lo]:h_off[hi]]
+                a_slice = a_ids[a_off[lo]:a_off[hi]]
+
+                # Calculate current lineup strength based on PAST games
+                h_strength[lo:hi] = self.strength(h_slice, h_off[lo:hi + 1], h_present[lo:hi])
+                a_strength[lo:hi] = self.strength(a_slice, a_off[lo:hi + 1], a_present[lo:hi])
+
+                # Post-game: update player memory for the NEXT chunk
+                self.update(*self.appearances(h_ids, h_off, a_ids, a_off, h_pts, a_pts, finished, lo, hi))
+
+        return h_strength, a_strength, index
+
+    @staticmethod
+    def appearances(h_ids, h_off, a_ids, a_off, h_pts, a_pts, finished, lo, hi):
+        """Flattens the appearances of finished matches lo..hi, home lineup before away lineup."""
+        ids, points = [np.empty(0, dtype=np.int64)], [np.empty(0)]
+        for i in np.flatnonzero(finished[lo:hi]) + lo:
+            h = h_ids[h_off[i]:h_off[i + 1]]
+            a = a_ids[a_off[i]:a_off[i + 1]]
+            ids.extend([h, a])
+            points.extend([np.full(len(h), h_pts[i]), np.full(len(a), a_pts[i])])
+        return np.concatenate(ids), np.concatenate(points)
+
+
+def match_points(df):
+    """Per-match (home, away) points: Win=1, Draw=0.5, Loss=0. NaN for future games."""
+    winner = df['Winner']
+    h_pts = np.select([winner == df['Home_Team'], winner == 'Draw'], [1.0, 0.5], default=0.0)
+    a_pts = 1.0 - h_pts
+    future = winner.isna().to_numpy()
+    h_pts[future] = np.nan
+    a_pts[future] = np.nan
+    return h_pts, a_pts
+
+
+def _conflict_free_chunks(h_ids, h_off, a_ids, a_off, finished, start, end):
+    """
+    Splits one matchday into runs of matches that share no players with an
+    earlier finished match of the same run. Inside such a run, reading every
+    lineup first and updating afterwards is identical to the sequential loop.
+    """
+    day_ids = np.concatenate([h_ids[h_off[start]:h_off[end]], a_ids[a_off[start]:a_off[end]]])
+    if len(np.unique(day_ids)) == len(day_ids):
+        yield start, end
+        return
+
+    # Rare path (duplicate rows, data errors): split greedily
+    lo = start
+    seen = set()
+    for i in range(start, end):
+        players = set(h_ids[h_off[i]:h_off[i + 1]].tolist()) | set(a_ids[a_off[i]:a_off[i + 1]].tolist())
+        if players & seen:
+            yield lo, i
+            lo = i
+            seen = set()
+        if finished[i]:
+            seen |= players
+    yield lo, end
@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+BROWSER_MEMORY_MB = 400  # Rough footprint of one headless Chrome + chromedriver
+BROWSERS_PER_CPU = 2     # Browsers spend much of their time waiting on the network
+
+
+def available_memory_mb():
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def pool_size(n_tasks, max_workers=None, memory_per_worker_mb=BROWSER_MEMORY_MB):
+    """Browser workers the machine can carry: BROWSERS_PER_CPU per CPU, bounded by free RAM and the number of tasks."""
+    size = (os.cpu_count() or 1) * BROWSERS_PER_CPU
+    memory = available_memory_mb()
+    if memory is not None:
+        size = min(size, max(1, int(memory // memory_per_worker_mb)))
+    if max_workers:
+        size = min(size, max_workers)
+    return max(1, min(size, n_tasks))
+
+
+class TaskScheduler:
+    """
+    Thread-safe priority queue of scrape tasks. Lower priority values run
+    first; failed tasks come back after an exponential backoff, up to
+    max_retries times. get() only returns None once nothing is queued,
+    waiting on a backoff or still running (a running task may add more).
+    """
+
+    def __init__(self, max_retries=3, backoff=2.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cond = threading.Condition()
+        self.ready = []    # (priority, seq, task, attempt)
+        self.delayed = []  # (ready_at, seq, priority, task, attempt)
+        self.seq = itertools.count()
+        self.active = 0
+        self.total = 0
+        self.done = 0
+        self.retries = 0
+        self.failed = []
+
+    def put(self, task, priority=0, attempt=0, delay=0.0):
+        with self.cond:
+            if attempt == 0:
+                self.total += 1
+            if delay > 0:
+                heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.seq), priority, task, attempt))
+            else:
+                heapq.heappush(self.ready, (priority, next(self.seq), task, attempt))
+            self.cond.notify()
+
+    def get(self):
+        """Next (task, priority, attempt), blocking while retries are pending; None when all work is finished."""
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, seq, priority, task, attempt = heapq.heappop(self.delayed)
+                    heapq.heappush(self.ready, (priority, seq, task, attempt))
+                if self.ready:
+                    priority, _, task, attempt = heapq.heappop(self.ready)
+                    self.active += 1
+                    return task, priority, attempt
+                if not self.delayed and self.active == 0:
+                    return None
+                timeout = self.delayed[0][0] - now if self.delayed else None
+                self.cond.wait(timeout)
+
+    def task_done(self):
+        with self.cond:
+            self.active -= 1
+            self.done += 1
+            self.cond.notify_all()
+
+    def retry(self, item):
+        """Requeues a failed item with backoff. Returns False once it has used all its retries."""
+        task, priority, attempt = item
+        with self.cond:
+            self.active -= 1
+            if attempt < self.max_retries:
+                self.retries += 1
+                heapq.heappush(self.delayed, (time.monotonic() + self.backoff * 2 ** attempt, next(self.seq), priority, task, attempt + 1))
+                requeued = True
+            else:
+                self.done += 1
+                self.failed.append(task)
+                requeued = False
+            self.cond.notify_all()
+        return requeued
+
+
+# ---------------------------------------------------------
+# TELEMETRY
+# ---------------------------------------------------------
+
+_local = threading.local()
+
+
+def bind_metrics(metrics):
+    """Makes `metrics` the one page timings on this thread are recorded into."""
+    _local.metrics = metrics
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+class WorkerMetrics:
+    """Counters for one worker. Only its own thread writes to it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.pages = 0
+        self.failures = 0
+        self.latencies = []
+
+    def page(self, seconds):
+        self.pages += 1
+        self.latencies.append(seconds)
+
+    def elapsed(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def summary(self):
+        lat = np.array(self.latencies) * 1000
+        elapsed = self.elapsed()
+        return {
+            'worker': self.name,
+            'pages': self.pages,
+            'failures': self.failures,
+            'elapsed_s': round(elapsed, 2),
+            'pages_per_sec': round(self.pages / elapsed, 3) if elapsed > 0 else 0.0,
+            'p50_ms': round(float(np.percentile(lat, 50)), 1) if len(lat) else None,
+            'p95_ms': round(float(np.percentile(lat, 95)), 1) if len(lat) else None,
+        }
+
+
+class Progress(threading.Thread):
+    """Prints one progress line every `interval` seconds (redrawn in place on a terminal)."""
+
+    def __init__(self, scheduler, metrics, lock, interval=1.0):
+        super().__init__(daemon=True)
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.lock = lock
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.start_time = time.perf_counter()
+        self.tty = sys.stderr.isatty()
+
+    def line(self):
+        s = self.scheduler
+        pages = sum(m.pages for m in self.metrics)
+        failures = sum(m.failures for m in self.metrics)
+        elapsed = time.perf_counter() - self.start_time
+        return (f"[progress] tasks {s.done}/{s.total} | running {s.active} | retrying {len(s.delayed)} | "
+                f"{pages} pages ({pages / elapsed:.2f}/s) | {failures} failures | {elapsed:.0f}s")
+
+    def run(self):
+        ticks = 0
+        while not self.stopped.wait(self.interval):
+            ticks += 1
+            # Off a terminal, a line every 10 intervals is enough for logs
+            if self.tty or ticks % 10 == 0:
+                with self.lock:
+                    sys.stderr.write(("\r" + self.line() + "\033[K") if self.tty else self.line() + "\n")
+                    sys.stderr.flush()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        if self.tty:
+            sys.stderr.write("\r" + self.line() + "\033[K\n")
+
+
+def write_summary(path, metrics, scheduler=None, page_timings=None):
+    """JSON run report: totals, per-worker pages/sec, failures and p50/p95 page latency."""
+    workers = [m.summary() for m in metrics]
+    report = {
+        'pages': sum(w['pages'] for w in workers),
+        'failures': sum(w['failures'] for w in workers),
+        'workers': workers,
+    }
+    if scheduler is not None:
+        report.update({'tasks': scheduler.total, 'retries': scheduler.retries,
+                       'failed_tasks': [list(t) for t in scheduler.failed]})
+    if page_timings:
+        report['page_types'] = {kind: {'pages': n, 'avg_load_ms': round(load_s / n * 1000, 1),
+                                       'avg_extract_ms': round(extract_s / n * 1000, 1)}
+                                for kind, (n, load_s, extract_s) in page_timings.items()}
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -1,15 +1,16 @@
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import argparse
 import threading
 import time
 import re
-import queue
 import os
-import numpy as np
+from competitions import COMPETITIONS, DEFAULT_COMPETITION, competition_seasons, current_season as season_now
+from match_store import MatchStore, store_path
+from scheduler import Progress, TaskScheduler, WorkerMetrics, bind_metrics, current_metrics, pool_size, write_summary
 
 # Mapping French stats to English column names
 STATS_TRANSLATIONS = {
@@ -24,14 +25,16 @@ STATS_TRANSLATIONS = {
     "Plaquages manqués": "Missed Tackles",
 }
 
-# Global queue and storage
-task_queue = queue.Queue()
-all_data = []
+BASE_URL = COMPETITIONS[DEFAULT_COMPETITION]['base_url']
+
+METRICS_FILE = "scrape_metrics.json"
+
+# Global storage (opened in main)
+store = None
 total_matches_scraped = 0
 
 # Locks
 print_lock = threading.Lock()
-results_lock = threading.Lock()
 
 def clean_value(val):
     if not val: return 0
@@ -73,260 +76,423 @@ def create_driver():
     driver.set_page_load_timeout(30)
     return driver
 
-def scrape_phase_data(driver, season, phase):
-    global total_matches_scraped
-    phase_data = []
+def build_row(season, phase, header, stats, lineups):
+    """
+    Turns the raw text pulled from a match's two pages into a CSV row.
+    Shared by every backend so translation and cleaning stay identical.
 
-    url = f"https://top14.lnr.fr/calendrier-et-resultats/{season}/{phase}"
+    header:  dict with home_team, away_team, score_text, meta_text
+    stats:   list of (title, left value, right value) from the .stats-bar blocks
+    lineups: dict with visiting_first, teams (two lists of names) and
+             officials (list of (position, name)), or None if the page failed
+    Returns (row, stats_count, p_debug).
+    """
+    home_team, away_team = header['home_team'], header['away_team']
+
+    # Handle Future Games
     try:
-        driver.get(url)
-        time.sleep(2)
+        score_text = header['score_text']
+        if score_text and "-" in score_text:
+            h_score, a_score = map(int, score_text.split("-"))
+            winner = home_team if h_score > a_score else (away_team if a_score > h_score else "Draw")
+        else:
+            raise ValueError("Future Game")
     except:
-        with print_lock: print(f"[!] [{season} {phase}] Timeout loading calendar.")
-        return []
+        h_score, a_score = 0, 0
+        winner = None # Flags this as a future game
+
+    match_date, match_time = extract_date_time(header['meta_text'])
+
+    row = {
+        "Season": season, "Phase": phase, "Date": match_date, "Time": match_time,
+        "Home_Team": home_team, "Away_Team": away_team, 
+        "Home_Score": h_score, "Away_Score": a_score,
+        "Winner": winner,
+        "Referee": "Unknown",
+        "Home_Lineup": "", "Away_Lineup": ""
+    }
+
+    stats_count = 0
+    if winner: # Only keep stats bars if game happened
+        for title, val_left, val_right in stats:
+            title = (title or "").strip()
+            if title in STATS_TRANSLATIONS:
+                en_title = STATS_TRANSLATIONS[title]
+                row[f"Home_{en_title}"] = clean_value(val_left)
+                row[f"Away_{en_title}"] = clean_value(val_right)
+                stats_count += 1
+
+    if lineups is None:
+        return row, stats_count, "FAIL: no line-up"
+
+    teams = lineups['teams']
+    if len(teams) >= 2:
+        t1_names, t2_names = teams[0], teams[1]
+        if lineups['visiting_first']:
+            row["Away_Lineup"] = ", ".join(t1_names)
+            row["Home_Lineup"] = ", ".join(t2_names)
+            p_debug = f"H:{len(t2_names)}/A:{len(t1_names)}"
+        else:
+            row["Home_Lineup"] = ", ".join(t1_names)
+            row["Away_Lineup"] = ", ".join(t2_names)
+            p_debug = f"H:{len(t1_names)}/A:{len(t2_names)}"
+    else:
+        p_debug = "0 Blocks"
+
+    for pos, name in lineups['officials']:
+        if "Arbitre" in (pos or ""):
+            row["Referee"] = name.strip()
+            break
+
+    return row, stats_count, p_debug
+
+def log_match(row, season, phase, stats_count, p_debug):
+    global total_matches_scraped
+    with print_lock:
+        total_matches_scraped += 1
+        # Mark future games clearly in print output
+        status_tag = "[OK]" if row['Winner'] else "[FUTURE]"
+        print(f"   {status_tag} [{season} {phase}] {row['Home_Team']} vs {row['Away_Team']}")
+        print(f"        Stats: {stats_count} | Ref: {row['Referee']} | Lineups: {p_debug}")
+        print("-" * 40)
+
+def record_match(row, url):
+    """Commits one scraped match to the store straight away."""
+    if store is not None:
+        store.upsert(row, url)
+
+def already_final(raw_link, season=None, phase=None):
+    """True if this match was already stored with a result, so it can be skipped."""
+    return store is not None and store.is_final(get_clean_urls(raw_link)[0], season, phase)
+
+# One injected script per page: the whole payload comes back in a single
+# WebDriver round-trip instead of one find_element/get_attribute per value
+CALENDAR_SCRIPT = """
+return Array.from(document.querySelectorAll("a.match-links__link[title='Feuille de match']"), a => a.href);
+"""
+
+STATS_SCRIPT = """
+const text = (root, sel) => { const el = root.querySelector(sel); return el ? el.textContent : null; };
+if (!document.querySelector('.match-header__title')) return null;
+return {
+    header: {
+        home_team: text(document, '.match-header-club__wrapper--left .match-header-club__title'),
+        away_team: text(document, '.match-header-club__wrapper--right .match-header-club__title'),
+        score_text: text(document, '.match-header__title .title'),
+        meta_text: text(document, '.match-header__season-day'),
+    },
+    stats: Array.from(document.querySelectorAll('.stats-bar'), bar => [
+        text(bar, '.stats-bar__title'), text(bar, '.stats-bar__val--left'), text(bar, '.stats-bar__val--right'),
+    ]),
+};
+"""
 
+COMPO_SCRIPT = """
+const text = (root, sel) => { const el = root.querySelector(sel); return el ? el.textContent : ''; };
+const container = document.querySelector('.line-up__classic');
+if (!container) return null;
+const officials = container.querySelector('.line-up__classic-team--officials');
+return {
+    visiting_first: container.classList.contains('line-up__classic--visiting-first'),
+    teams: Array.from(container.querySelectorAll('.line-up__classic-team:not(.line-up__classic-team--officials)'))
+        .slice(0, 2)
+        .map(block => Array.from(block.querySelectorAll('.player-block__name'), p => p.textContent.trim())),
+    officials: officials ? Array.from(officials.querySelectorAll('.player-block'),
+        off => [text(off, '.player-block__position'), text(off, '.player-block__name')]) : [],
+};
+"""
+
+# Per page type: [pages, seconds loading, seconds extracting]
+page_timings = {}
+timings_lock = threading.Lock()
+
+def record_timing(kind, load_s, extract_s):
+    with timings_lock:
+        t = page_timings.setdefault(kind, [0, 0.0, 0.0])
+        t[0] += 1
+        t[1] += load_s
+        t[2] += extract_s
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.page(load_s + extract_s)
+
+def print_timings():
+    if not page_timings:
+        return
+    print("\n--- Browser page timings (avg per page) ---")
+    for kind, (n, load_s, extract_s) in page_timings.items():
+        print(f"{kind:<10} {n:>5} pages | load+wait {load_s / n * 1000:7.0f} ms | extract {extract_s / n * 1000:6.1f} ms")
+
+def scrape_match(driver, season, phase, raw_link):
+    """Scrapes one match through the browser. Returns the row, or None if the stats page failed."""
+    stats_url, compo_url = get_clean_urls(raw_link)
+
+    # 1. Get Match Stats
     try:
-        links = driver.find_elements(By.CSS_SELECTOR, "a.match-links__link[title='Feuille de match']")
-        match_urls = list(set([link.get_attribute('href') for link in links]))
-    except:
-        return []
-    
-    for i, raw_link in enumerate(match_urls):
-        row = {}
-        stats_count = 0
-        stats_url, compo_url = get_clean_urls(raw_link)
+        start = time.perf_counter()
+        driver.get(stats_url)
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "match-header__title")))
+        loaded = time.perf_counter()
+        payload = driver.execute_script(STATS_SCRIPT)
+        record_timing("stats", loaded - start, time.perf_counter() - loaded)
 
-        # 1. Get Match Stats
-        try:
-            driver.get(stats_url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "match-header__title")))
-            
-            home_team = driver.find_element(By.CSS_SELECTOR, ".match-header-club__wrapper--left .match-header-club__title").get_attribute("textContent").strip()
-            away_team = driver.find_element(By.CSS_SELECTOR, ".match-header-club__wrapper--right .match-header-club__title").get_attribute("textContent").strip()
-            
-            # Handle Future Games
-            try:
-                score_text = driver.find_element(By.CSS_SELECTOR, ".match-header__title .title").get_attribute("textContent").strip()
-                if "-" in score_text:
-                    h_score, a_score = map(int, score_text.split("-"))
-                    winner = home_team if h_score > a_score else (away_team if a_score > h_score else "Draw")
-                else:
-                    raise ValueError("Future Game")
-            except:
-                h_score, a_score = 0, 0
-                winner = None # Flags this as a future game
-            
-            meta_text = driver.find_element(By.CLASS_NAME, "match-header__season-day").get_attribute("textContent").strip()
-            match_date, match_time = extract_date_time(meta_text)
-
-            row = {
-                "Season": season, "Phase": phase, "Date": match_date, "Time": match_time,
-                "Home_Team": home_team, "Away_Team": away_team, 
-                "Home_Score": h_score, "Away_Score": a_score,
-                "Winner": winner,
-                "Referee": "Unknown",
-                "Home_Lineup": "", "Away_Lineup": ""
-            }
-
-            if winner: # Only scrape stats bars if game happened
-                bars = driver.find_elements(By.CSS_SELECTOR, ".stats-bar")
-                for bar in bars:
-                    try:
-                        title = bar.find_element(By.CSS_SELECTOR, ".stats-bar__title").get_attribute("textContent").strip()
-                        if title in STATS_TRANSLATIONS:
-                            en_title = STATS_TRANSLATIONS[title]
-                            val_left = bar.find_element(By.CSS_SELECTOR, ".stats-bar__val--left").get_attribute("textContent")
-                            val_right = bar.find_element(By.CSS_SELECTOR, ".stats-bar__val--right").get_attribute("textContent")
-                            row[f"Home_{en_title}"] = clean_value(val_left)
-                            row[f"Away_{en_title}"] = clean_value(val_right)
-                            stats_count += 1
-                    except: continue
-
-        except Exception:
-            continue
-
-        # 2. Get Lineups and Referee
+        header = payload["header"]
+        header["home_team"] = header["home_team"].strip()
+        header["away_team"] = header["away_team"].strip()
+        header["meta_text"] = header["meta_text"].strip()
+        header["score_text"] = header["score_text"].strip() if header["score_text"] else None
+        stats = [(title.strip(), val_left, val_right) for title, val_left, val_right in payload["stats"]
+                 if title and title.strip() in STATS_TRANSLATIONS]
+
+    except Exception:
+        return None
+
+    # 2. Get Lineups and Referee
+    try:
+        start = time.perf_counter()
         driver.get(compo_url)
-        try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "line-up__classic")))
-            classic_container = driver.find_element(By.CLASS_NAME, "line-up__classic")
-            
-            team_blocks = classic_container.find_elements(By.CSS_SELECTOR, ".line-up__classic-team:not(.line-up__classic-team--officials)")
-            is_visiting_first = "line-up__classic--visiting-first" in classic_container.get_attribute("class")
-            
-            if len(team_blocks) >= 2:
-                t1_names = [p.get_attribute("textContent").strip() for p in team_blocks[0].find_elements(By.CLASS_NAME, "player-block__name")]
-                t2_names = [p.get_attribute("textContent").strip() for p in team_blocks[1].find_elements(By.CLASS_NAME, "player-block__name")]
-                
-                if is_visiting_first:
-                    row["Away_Lineup"] = ", ".join(t1_names)
-                    row["Home_Lineup"] = ", ".join(t2_names)
-                    p_debug = f"H:{len(t2_names)}/A:{len(t1_names)}"
-                else:
-                    row["Home_Lineup"] = ", ".join(t1_names)
-                    row["Away_Lineup"] = ", ".join(t2_names)
-                    p_debug = f"H:{len(t1_names)}/A:{len(t2_names)}"
-            else:
-                p_debug = "0 Blocks"
-
-            try:
-                ref_block = classic_container.find_element(By.CSS_SELECTOR, ".line-up__classic-team--officials")
-                officials = ref_block.find_elements(By.CLASS_NAME, "player-block")
-                for off in officials:
-                    pos = off.find_element(By.CLASS_NAME, "player-block__position").get_attribute("textContent")
-                    if "Arbitre" in pos:
-                        row["Referee"] = off.find_element(By.CLASS_NAME, "player-block__name").get_attribute("textContent").strip()
-                        break
-            except: pass 
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "line-up__classic")))
+        loaded = time.perf_counter()
+        lineups = driver.execute_script(COMPO_SCRIPT)
+        record_timing("lineups", loaded - start, time.perf_counter() - loaded)
+        if lineups is None:
+            raise ValueError("line-up container vanished")
 
-        except Exception as e:
-            error_msg = str(e).split('\n')[0]
-            p_debug = f"FAIL: {error_msg}"
+    except Exception as e:
+        error_msg = str(e).split('\n')[0]
+        row, stats_count, _ = build_row(season, phase, header, stats, None)
+        log_match(row, season, phase, stats_count, f"FAIL: {error_msg}")
+        record_match(row, stats_url)
+        return row
 
-        phase_data.append(row)
-        
-        with print_lock:
-            total_matches_scraped += 1
-            # Mark future games clearly in print output
-            status_tag = "[OK]" if row['Winner'] else "[FUTURE]"
-            print(f"   {status_tag} [{season} {phase}] {home_team} vs {away_team}")
-            print(f"        Stats: {stats_count} | Ref: {row['Referee']} | Lineups: {p_debug}")
-            print("-" * 40)
-            
-    return phase_data
+    row, stats_count, p_debug = build_row(season, phase, header, stats, lineups)
+    log_match(row, season, phase, stats_count, p_debug)
+    record_match(row, stats_url)
+    return row
 
-def worker_thread(worker_id):
+def scrape_calendar(driver, season, phase, base_url=None):
+    """Match links of a round that aren't stored as final yet. Raises if the calendar doesn't load."""
+    base_url = base_url or BASE_URL
+    url = f"{base_url}/calendrier-et-resultats/{season}/{phase}"
+
+    start = time.perf_counter()
+    driver.get(url)
+    time.sleep(2)
+    loaded = time.perf_counter()
+    match_urls = sorted(set(driver.execute_script(CALENDAR_SCRIPT)))
+    record_timing("calendar", loaded - start, time.perf_counter() - loaded)
+    return [u for u in match_urls if not already_final(u, season, phase)]
+
+def task_priority(task, current_season):
+    """Current season first, latest rounds (the upcoming one included) ahead; then playoffs; then older rounds."""
+    season, phase = task[0], task[1]
+    if season == current_season:
+        return (0, -int(phase[1:])) if phase[1:].isdigit() else (0, 0)
+    return (2, 0) if phase.startswith("j") else (1, 0)
+
+def worker_thread(worker_id, scheduler, metrics, base_url=None):
     print(f"[Worker {worker_id}] Starting Browser...")
+    bind_metrics(metrics)
     driver = create_driver()
     
     while True:
-        try:
-            season, phase = task_queue.get(block=False)
-        except queue.Empty:
+        item = scheduler.get()
+        if item is None:
             break
+        task, priority, attempt = item
         
         try:
-            data = scrape_phase_data(driver, season, phase)
-            with results_lock:
-                all_data.extend(data)
+            # (season, phase) fetches a round's calendar and queues its matches;
+            # (season, phase, link) scrapes one match (committed to the store)
+            if len(task) == 3:
+                if scrape_match(driver, *task) is None:
+                    raise RuntimeError("stats page did not load")
+            else:
+                for link in scrape_calendar(driver, *task, base_url=base_url):
+                    scheduler.put((task[0], task[1], link), priority)
+            scheduler.task_done()
         except Exception as e:
+            metrics.failures += 1
+            requeued = scheduler.retry(item)
             with print_lock:
-                print(f"[ERR] Worker {worker_id} Failed on {season}-{phase}: {e}")
-        finally:
-            task_queue.task_done()
+                status = f"retry {attempt + 1}/{scheduler.max_retries}" if requeued else "giving up"
+                print(f"[ERR] Worker {worker_id} failed on {task[0]}-{task[1]} ({status}): {str(e).splitlines()[0] if str(e) else type(e).__name__}")
             
+    metrics.end = time.perf_counter()
     print(f"[Worker {worker_id}] Finished. Closing Browser.")
     driver.quit()
 
-def get_completed_phases(filename):
-    """Returns a set of (Season, Phase) tuples that are already fully scraped."""
-    if not os.path.exists(filename): 
-        return set()
+def run_browser_workers(scheduler, num_workers, base_url=None):
+    """Runs the browser pool until the scheduler is drained. Returns each worker's metrics."""
+    threads, metrics = [], []
+    progress = Progress(scheduler, metrics, print_lock)
     
-    print(f"Checking {filename} for existing data...")
-    df = pd.read_csv(filename)
-    
-    # Only count rows where we actually have a winner (game is over)
-    finished_games = df[df['Winner'].notna()]
-    
-    # Count completed games per phase
-    counts = finished_games.groupby(['Season', 'Phase']).size()
+    print(f"Starting {num_workers} workers...")
+    progress.start()
+    for i in range(num_workers):
+        metrics.append(WorkerMetrics(f"browser-{i+1}"))
+        t = threading.Thread(target=worker_thread, args=(i+1, scheduler, metrics[-1], base_url))
+        t.start()
+        threads.append(t)
+        time.sleep(1) 
+
+    for t in threads:
+        t.join()
+    progress.stop()
+    return metrics
+
+def get_completed_phases(match_store, competition=DEFAULT_COMPETITION):
+    """Returns a set of (Season, Phase) tuples that are already fully scraped."""
+    # Count completed games (rows with a winner) per phase
+    counts = match_store.finished_counts()
     
-    # Define expected game counts
-    # Regular season (jX) usually has 7. Playoffs have specific counts.
-    PLAYOFF_COUNTS = {
-        "barrage": 2,
-        "demi-finale": 2,
-        "finale": 1,
-        "access-top-14": 1,
-        "match-daccession": 1
-    }
+    # Expected game counts: games_per_round for a regular round (jX), specific counts for playoffs
+    games_per_round = COMPETITIONS[competition]['games_per_round']
+    playoff_counts = COMPETITIONS[competition]['playoff_phases']
 
     completed = set()
     for (season, phase), count in counts.items():
         if phase.startswith('j'):
-            if count >= 7: # Regular season standard
+            if count >= games_per_round: # Regular season standard
                 completed.add((season, phase))
-        elif phase in PLAYOFF_COUNTS:
-            if count >= PLAYOFF_COUNTS[phase]: # Playoff standard
+        elif phase in playoff_counts:
+            if count >= playoff_counts[phase]: # Playoff standard
                 completed.add((season, phase))
             
     return completed
 
-def main():
-    seasons = ["2020-2021","2021-2022","2022-2023", "2023-2024", "2024-2025", "2025-2026"]
-    playoff_phases = ["barrage", "demi-finale", "finale", "access-top-14", "match-daccession"]
-    filename = "Top14_Raw_Scrape.csv"
+def next_round(match_store, season):
+    """Number of the first regular round of `season` after the last one with any result (1 if none)."""
+    played = [int(phase[1:]) for (s, phase), n in match_store.finished_counts().items()
+              if s == season and phase[1:].isdigit() and n > 0]
+    return max(played, default=0) + 1
+
+def open_store(filename):
+    """Opens the match store next to the CSV, seeding it from the CSV on first use."""
+    match_store = MatchStore(store_path(filename))
+    if len(match_store) == 0 and os.path.exists(filename):
+        n = match_store.import_csv(filename)
+        print(f"Imported {n} rows from {filename} into {match_store.path}.")
+        match_store.changes = 0  # The CSV already has them
+    return match_store
+
+def export_csv(match_store, filename):
+    """Writes the whole store to the CSV read by the prediction side."""
+    df = match_store.to_frame()
+    if df.empty:
+        print("\n[!] No data collected.")
+        return
+    # Normalize columns
+    for k in STATS_TRANSLATIONS.values():
+        if f"Home_{k}" not in df.columns: df[f"Home_{k}"] = 0
+        if f"Away_{k}" not in df.columns: df[f"Away_{k}"] = 0
+    tmp = filename + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, filename)
+    print(f"Exported {len(df)} matches to {filename}.")
+
+def main(backend="http", base_url=None, concurrency=16, filename=None, export=True,
+         workers=None, max_retries=3, metrics_file=METRICS_FILE, competition=DEFAULT_COMPETITION):
+    global store
+    comp = COMPETITIONS[competition]
+    base_url = base_url or comp['base_url']
+    filename = filename or comp['data_file']
+    seasons = competition_seasons(competition)
+    playoff_phases = list(comp['playoff_phases'])
+    print(f"Competition: {comp['name']} ({base_url}), seasons {seasons[0]} to {seasons[-1]}")
 
     # 1. Identify what to skip
-    completed_phases = get_completed_phases(filename)
+    store = open_store(filename)
+    completed_phases = get_completed_phases(store, competition)
     print(f"Skipping {len(completed_phases)} previously completed phases.")
 
     # 2. Populate the Queue
     print("--- Setting up tasks ---")
+    current_season = season_now()
+    scheduler = TaskScheduler(max_retries=max_retries)
+    tasks = []
     for s in seasons:
-        # Increase limit to include the future round (e.g., 14 to get J13)
-        limit = 13 if s == "2025-2026" else 27
-        for j in range(1, limit):
+        # Current season: up to the next round to be played (fixtures and lineups), not beyond
+        last = min(next_round(store, s), comp['rounds']) if s == current_season else comp['rounds']
+        for j in range(1, last + 1):
             phase_id = f"j{j}"
             
             # --- SKIP LOGIC ---
             if (s, phase_id) in completed_phases:
                 continue
             
-            task_queue.put((s, phase_id))
+            tasks.append((s, phase_id))
             
-        if s != "2025-2026":
+        if s != current_season:
             for phase in playoff_phases:
                 if (s, phase) in completed_phases:
                     continue
-                task_queue.put((s, phase))
+                tasks.append((s, phase))
+    tasks.sort(key=lambda t: task_priority(t, current_season))
     
-    print(f"Total Tasks in Queue: {task_queue.qsize()}")
+    print(f"Total Tasks in Queue: {len(tasks)}")
     
-    if task_queue.qsize() == 0:
+    if not tasks:
         print("Nothing new to scrape.")
+        store.close()
         return
 
-    # 3. Launch Threads
-    num_workers = 4
-    threads = []
-    
-    print(f"Starting {num_workers} workers...")
-    for i in range(num_workers):
-        t = threading.Thread(target=worker_thread, args=(i+1,))
-        t.start()
-        threads.append(t)
-        time.sleep(1) 
+    # 3. Scrape
+    metrics = []
+    if backend == "http":
+        # Imported here so the browser-only path doesn't need aiohttp/selectolax
+        from scrape_http import HttpScraper
 
-    for t in threads:
-        t.join()
+        scraper = HttpScraper(base_url, concurrency, store=store)
+        scraper.run(tasks)
+        metrics.append(scraper.metrics)
 
-    # 4. Export (Smart Merge)
-    if all_data:
-        new_df = pd.DataFrame(all_data)
-        
-        # Normalize columns
-        for k in STATS_TRANSLATIONS.values():
-            if f"Home_{k}" not in new_df.columns: new_df[f"Home_{k}"] = 0
-            if f"Away_{k}" not in new_df.columns: new_df[f"Away_{k}"] = 0
-            
-        if os.path.exists(filename):
-            print(f"Merging with existing {filename}...")
-            existing_df = pd.read_csv(filename)
-            combined_df = pd.concat([existing_df, new_df])
-            
-            # DEDUPLICATE: Keep the 'last' entry (the new one) for any Season/Phase/HomeTeam combo
-            final_df = combined_df.drop_duplicates(subset=['Season', 'Phase', 'Home_Team'], keep='last')
-            print(f"Merged: {len(existing_df)} old + {len(new_df)} new -> {len(final_df)} total unique.")
-        else:
-            final_df = new_df
-            print(f"Created new file with {len(final_df)} matches.")
-            
-        final_df.to_csv(filename, index=False)
-        print(f"\n[Success] Database updated.")
+        # Whatever the static HTML couldn't give us goes through the browser
+        browser_tasks = scraper.fallback_phases + scraper.fallback_matches
+        if browser_tasks:
+            print(f"Browser fallback for {len(scraper.fallback_phases)} phases and {len(scraper.fallback_matches)} matches.")
     else:
-        print("\n[!] No data collected.")
+        browser_tasks = tasks
+
+    if browser_tasks:
+        for task in browser_tasks:
+            scheduler.put(task, task_priority(task, current_season))
+        num_workers = pool_size(len(browser_tasks), workers)
+        metrics += run_browser_workers(scheduler, num_workers, base_url)
+
+    print_timings()
+    report = write_summary(metrics_file, metrics, scheduler, page_timings)
+    for w in report['workers']:
+        print(f"{w['worker']:<12} {w['pages']:>5} pages | {w['pages_per_sec']:6.2f}/s | {w['failures']:>3} failures | p50 {w['p50_ms']} ms | p95 {w['p95_ms']} ms")
+    if scheduler.failed:
+        print(f"[!] {len(scheduler.failed)} tasks failed after {max_retries} retries (see {metrics_file}).")
+
+    # 4. Export (only when the store changed)
+    print(f"\n[Success] {store.changes} matches added or updated in {store.path}.")
+    if export and store.changes:
+        export_csv(store, filename)
+    store.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape LNR (Top 14, Pro D2) results, stats and lineups from lnr.fr.")
+    parser.add_argument("command", nargs="?", default="scrape", choices=["scrape", "export"],
+                        help="scrape: update the match store (default); export: write the store out to the CSV")
+    parser.add_argument("--backend", choices=["http", "selenium"], default="http",
+                        help="http: async fetch + HTML parser, browser only as fallback (default); selenium: browser for everything")
+    parser.add_argument("--competition", choices=list(COMPETITIONS), default=DEFAULT_COMPETITION,
+                        help="Competition to scrape (sets the site, seasons and default CSV)")
+    parser.add_argument("--base-url", default=None, help="Site root (default: the competition's; point at a local fixture server for testing)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max HTTP requests in flight")
+    parser.add_argument("--workers", type=int, default=None, help="Cap on browser workers (default: sized to CPUs and free RAM)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per failed round/match, with exponential backoff")
+    parser.add_argument("--metrics", default=METRICS_FILE, help="JSON run report (per-worker pages/sec, failures, p50/p95 latency)")
+    parser.add_argument("--csv", default=None, help="CSV export (default: the competition's; the store sits next to it as .sqlite)")
+    parser.add_argument("--no-export", action="store_true", help="Only update the store, don't rewrite the CSV")
+    args = parser.parse_args()
+
+    csv = args.csv or COMPETITIONS[args.competition]['data_file']
+    if args.command == "export":
+        export_csv(open_store(csv), csv)
+    else:
+        main(args.backend, args.base_url, args.concurrency, csv, export=not args.no_export,
+             workers=args.workers, max_retries=args.retries, metrics_file=args.metrics, competition=args.competition)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from urllib.parse import urljoin
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from scheduler import WorkerMetrics
+from scrape import BASE_URL, STATS_TRANSLATIONS, build_row, get_clean_urls, log_match, print_lock
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def _text(node, selector):
+    found = node.css_first(selector)
+    return found.text(deep=True) if found is not None else None
+
+
+def parse_calendar(html, base_url):
+    tree = HTMLParser(html)
+    links = tree.css("a.match-links__link[title='Feuille de match']")
+    return sorted({urljoin(base_url + "/", a.attributes.get('href') or "") for a in links if a.attributes.get('href')})
+
+
+def parse_stats_page(html):
+    """(header, stats) from a /statistiques-du-match page, or None if the header isn't in the HTML."""
+    tree = HTMLParser(html)
+    if tree.css_first(".match-header__title") is None:
+        return None
+    home_team = _text(tree, ".match-header-club__wrapper--left .match-header-club__title")
+    away_team = _text(tree, ".match-header-club__wrapper--right .match-header-club__title")
+    meta_text = _text(tree, ".match-header__season-day")
+    if home_team is None or away_team is None or meta_text is None:
+        return None
+
+    header = {
+        "home_team": home_team.strip(),
+        "away_team": away_team.strip(),
+        "score_text": (_text(tree, ".match-header__title .title") or "").strip() or None,
+        "meta_text": meta_text.strip(),
+    }
+    stats = []
+    for bar in tree.css(".stats-bar"):
+        title = (_text(bar, ".stats-bar__title") or "").strip()
+        if title in STATS_TRANSLATIONS:
+            stats.append((title, _text(bar, ".stats-bar__val--left"), _text(bar, ".stats-bar__val--right")))
+    return header, stats
+
+
+def parse_compo_page(html):
+    """Lineups payload from a /compositions page, or None if the line-up isn't in the HTML."""
+    tree = HTMLParser(html)
+    container = tree.css_first(".line-up__classic")
+    if container is None:
+        return None
+    team_blocks = [b for b in container.css(".line-up__classic-team")
+                   if "line-up__classic-team--officials" not in (b.attributes.get('class') or "")]
+    officials = []
+    ref_block = container.css_first(".line-up__classic-team--officials")
+    if ref_block is not None:
+        for off in ref_block.css(".player-block"):
+            officials.append((_text(off, ".player-block__position") or "", _text(off, ".player-block__name") or ""))
+    return {
+        "visiting_first": "line-up__classic--visiting-first" in (container.attributes.get('class') or ""),
+        "teams": [[p.text(deep=True).strip() for p in block.css(".player-block__name")] for block in team_blocks[:2]],
+        "officials": officials,
+    }
+
+
+class HttpScraper:
+    """
+    Fetches calendar and match pages over one pooled keep-alive session with
+    at most `concurrency` requests in flight. Pages whose data isn't in the
+    static HTML are handed back for the Selenium fallback. With a MatchStore,
+    matches already stored with a result are skipped and each new row is
+    committed as soon as it is parsed.
+    """
+
+    def __init__(self, base_url=BASE_URL, concurrency=16, timeout=20, retries=2, store=None):
+        self.base_url = base_url.rstrip("/")
+        self.store = store
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.fallback_phases = []   # (season, phase): calendar had no match links
+        self.fallback_matches = []  # (season, phase, link): match pages needed a browser
+        self.metrics = WorkerMetrics("http")
+
+    async def fetch(self, session, url):
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.semaphore:
+                    start = time.perf_counter()
+                    async with session.get(url) as resp:
+                        if resp.status in (200, 404):
+                            html = await resp.text() if resp.status == 200 else None
+                            self.metrics.page(time.perf_counter() - start)
+                            return html
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            self.metrics.failures += 1
+            await asyncio.sleep(0.5 * 2 ** attempt)
+        return None
+
+    async def scrape_match(self, session, season, phase, link):
+        stats_url, compo_url = get_clean_urls(link)
+        stats_html, compo_html = await asyncio.gather(self.fetch(session, stats_url), self.fetch(session, compo_url))
+
+        parsed = parse_stats_page(stats_html) if stats_html else None
+        if parsed is None:
+            self.fallback_matches.append((season, phase, link))
+            return None
+
+        # Future games often have no line-up yet; a finished game without one needs the browser
+        header, stats = parsed
+        lineups = parse_compo_page(compo_html) if compo_html else None
+        if lineups is None and "-" in (header["score_text"] or ""):
+            self.fallback_matches.append((season, phase, link))
+            return None
+
+        row, stats_count, p_debug = build_row(season, phase, header, stats, lineups)
+        log_match(row, season, phase, stats_count, p_debug)
+        if self.store is not None:
+            self.store.upsert(row, stats_url)
+        return row
+
+    async def scrape_phase(self, session, season, phase):
+        html = await self.fetch(session, f"{self.base_url}/calendrier-et-resultats/{season}/{phase}")
+        links = parse_calendar(html, self.base_url) if html else []
+        if not links:
+            with print_lock: print(f"[!] [{season} {phase}] No match links in static HTML, queued for browser.")
+            self.fallback_phases.append((season, phase))
+            return []
+        if self.store is not None:
+            links = [link for link in links if not self.store.is_final(get_clean_urls(link)[0], season, phase)]
+        rows = await asyncio.gather(*(self.scrape_match(session, season, phase, link) for link in links))
+        return [r for r in rows if r is not None]
+
+    async def scrape(self, tasks):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}) as session:
+            results = await asyncio.gather(*(self.scrape_phase(session, s, p) for s, p in tasks))
+        self.metrics.end = time.perf_counter()
+        return [row for rows in results for row in rows]
+
+    def run(self, tasks):
+        """Scrapes every (season, phase) task. Returns the rows; see fallback_* for what's left."""
+        return asyncio.run(self.scrape(tasks))
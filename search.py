@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from dataset import read_matches
+from features import DATA_FILE, FEATURE_PARAMS, feature_columns, load_matches
+from feature_store import FeatureStore, params_hash
+from lineups import load_lineups
+from models import MODEL_PARAMS
+from walk_forward import fit_fold, make_folds
+
+RESULTS_FILE = 'search_results.csv'
+
+# Values tried per parameter. Keys of FEATURE_PARAMS change the feature
+# matrix; anything else is passed to the Random Forest.
+SEARCH_SPACE = {
+    'n_estimators': [150, 300, 600],
+    'max_depth': [6, 10, 16, None],
+    'min_samples_leaf': [1, 3, 5, 10],
+    'max_features': ['sqrt', 0.5],
+    'window': [3, 5, 8],
+    'C': [2, 5, 10],
+    'decay': [0.97, 0.99, 1.0],
+    'elo_k': [10, 20],
+}
+
+# Random candidates drawn by default; the full SEARCH_SPACE grid is thousands of forests per round (--grid)
+DEFAULT_SAMPLES = 60
+
+# Lower is better for every metric but accuracy
+METRICS = {'log_loss': 'Log_Loss', 'brier': 'Brier', 'accuracy': 'Accuracy'}
+
+# Feature matrices shared by every task in a worker process (set once by _init_worker)
+_matrices = {}
+
+
+def _init_worker(matrices):
+    _matrices.update(matrices)
+
+
+def _evaluate(task):
+    feature_key, model_params, fold = task
+    X, y = _matrices[feature_key]
+    return fit_fold(X, y, fold, model_params)
+
+
+def _build(args):
+    filename, params = args
+    return FeatureStore().load(filename, params)
+
+
+def split_params(params):
+    """(feature params, model params) for one candidate."""
+    features = {k: v for k, v in params.items() if k in FEATURE_PARAMS}
+    model = {k: v for k, v in params.items() if k not in FEATURE_PARAMS}
+    return {**FEATURE_PARAMS, **features}, model
+
+
+def candidates(space, samples=None, seed=0):
+    """Every combination of `space`, or `samples` distinct random ones."""
+    keys = list(space)
+    n_grid = math.prod(len(space[k]) for k in keys)
+    if samples is None or samples >= n_grid:
+        return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(n_grid, size=samples, replace=False)
+    out = []
+    for flat in picked:
+        params = {}
+        for k in reversed(keys):
+            flat, i = divmod(int(flat), len(space[k]))
+            params[k] = space[k][i]
+        out.append({k: params[k] for k in keys})
+    return out
+
+
+def rung_budgets(n_folds, rungs, eta):
+    """Folds scored at each rung: n_folds / eta^(rungs-1), ..., n_folds."""
+    return sorted({max(1, math.ceil(n_folds / eta ** r)) for r in range(rungs)})
+
+
+def weighted(rows):
+    games = np.array([r['Test_Games'] for r in rows])
+    out = {'Folds': len(rows), 'Games': int(games.sum())}
+    for m in ('Accuracy', 'Log_Loss', 'Brier'):
+        out[m] = float(np.average([r[m] for r in rows], weights=games))
+    out['Fit_Seconds'] = float(sum(r['Fit_Seconds'] for r in rows))
+    return out
+
+
+def search(params_list, filename=DATA_FILE, seasons=None, workers=None, metric='log_loss',
+           rungs=3, eta=3, min_train=50, seed=0):
+    """
+    Successive halving over walk-forward rounds. Every candidate is scored
+    on a small random subset of rounds, the best 1/eta go on to a larger
+    subset, and so on until the survivors have been scored on every round.
+    The feature frame is built (or loaded from the feature store) once per
+    distinct feature-parameter set and shared by all models that use it.
+    Returns one row per candidate (Candidate = its index in params_list), best first.
+    """
+    workers = workers or os.cpu_count() or 1
+    column = METRICS[metric]
+    sign = -1 if metric == 'accuracy' else 1
+
+    # One feature matrix per distinct feature-parameter set
+    split = [split_params(p) for p in params_list]
+    feature_sets = {params_hash(f): f for f, _ in split}
+    print(f"Search: {len(params_list)} candidates over {len(feature_sets)} feature set(s) on {workers} worker(s).")
+    jobs = [(filename, f) for f in feature_sets.values()]
+    # Typed and lineup caches are built here once, so the workers only read them
+    load_lineups(filename, load_matches(filename))
+    if workers == 1 or len(jobs) == 1:
+        frames = [_build(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            frames = list(pool.map(_build, jobs))
+
+    matrices, folds = {}, {}
+    for key, params, frame in zip(feature_sets, feature_sets.values(), frames):
+        features = feature_columns(params)
+        frame = frame.dropna(subset=features).reset_index(drop=True)
+        matrices[key] = (frame[features].to_numpy(dtype=np.float64), frame['Target'].fillna(-1).to_numpy(dtype=np.int64))
+        folds[key] = {(f['Season'], f['Phase']): f for f in make_folds(frame, seasons, min_train)}
+
+    # Same random round order for everyone, so rung subsets are comparable
+    rounds = sorted(set().union(*(f.keys() for f in folds.values())))
+    if not rounds:
+        return pd.DataFrame()
+    rounds = [rounds[i] for i in np.random.default_rng(seed).permutation(len(rounds))]
+
+    scored = [dict() for _ in params_list]  # candidate -> {round: fold result}
+    alive = list(range(len(params_list)))
+    reached = [0] * len(params_list)
+    start = time.perf_counter()
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrices,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(matrices)
+    try:
+        budgets = rung_budgets(len(rounds), rungs, eta)
+        for rung, budget in enumerate(budgets):
+            tasks, owners = [], []
+            for c in alive:
+                key = params_hash(split[c][0])
+                for r in rounds[:budget]:
+                    if r in folds[key] and r not in scored[c]:
+                        tasks.append((key, split[c][1], folds[key][r]))
+                        owners.append((c, r))
+            results = pool.map(_evaluate, tasks, chunksize=max(1, len(tasks) // (workers * 4))) if pool else map(_evaluate, tasks)
+            for (c, r), row in zip(owners, results):
+                scored[c][r] = row
+
+            ranking = sorted(alive, key=lambda c: sign * weighted(list(scored[c].values()))[column])
+            for c in alive:
+                reached[c] = rung
+            keep = len(ranking) if rung == len(budgets) - 1 else max(1, math.ceil(len(ranking) / eta))
+            print(f"Rung {rung}: {len(alive)} candidates x {budget} rounds ({len(tasks)} fits), "
+                  f"best {column} {weighted(list(scored[ranking[0]].values()))[column]:.4f}, keeping {keep} "
+                  f"[{time.perf_counter() - start:.1f}s]")
+            alive = ranking[:keep]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    table = []
+    for c, params in enumerate(params_list):
+        table.append({'Candidate': c, **params, 'Rung': reached[c], **weighted(list(scored[c].values()))})
+    table = pd.DataFrame(table)
+    # Candidates that went further rank first, then by the metric on their last rung
+    table['_order'] = sign * table[column]
+    table = table.sort_values(['Rung', '_order'], ascending=[False, True]).drop(columns='_order').reset_index(drop=True)
+    table.insert(0, 'Rank', np.arange(1, len(table) + 1))
+    return table
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward search over model and feature parameters.")
+    parser.add_argument('--space', help="JSON file mapping parameter -> list of values (default: SEARCH_SPACE)")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help=f"Random candidates to draw (default: {DEFAULT_SAMPLES})")
+    parser.add_argument('--grid', action='store_true', help="Search every combination instead of sampling (thousands with SEARCH_SPACE)")
+    parser.add_argument('--seasons', nargs='*', help="Seasons whose rounds are scored (default: the last two)")
+    parser.add_argument('--metric', default='log_loss', choices=list(METRICS))
+    parser.add_argument('--rungs', type=int, default=3, help="Successive-halving rungs (1 = score everything on every round)")
+    parser.add_argument('--eta', type=int, default=3, help="Keep the best 1/eta candidates at each rung")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: all cores)")
+    parser.add_argument('--min-train', type=int, default=50, help="Skip rounds with fewer past games")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', default=DATA_FILE)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    space = SEARCH_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    seasons = args.seasons
+    if not seasons:
+        seasons = sorted(read_matches(args.csv, columns=['Season'])['Season'].unique())[-2:]
+
+    start = time.perf_counter()
+    params_list = candidates(space, None if args.grid else args.samples, args.seed)
+    table = search(params_list, args.csv, seasons, args.workers, args.metric,
+                   args.rungs, args.eta, args.min_train, args.seed)
+    if table.empty:
+        print("No rounds to score.")
+    else:
+        pd.set_option('display.width', 1000)
+        print(table.head(10).to_string(index=False, float_format='{:.4f}'.format))
+        print(f"\n{len(table)} candidates in {time.perf_counter() - start:.1f}s")
+        table.to_csv(args.output, index=False)
+        print(f"Saved ranked results to '{args.output}'")
+
+        feature_params, model_params = split_params(params_list[table['Candidate'].iloc[0]])
+        print(f"Best MODEL_PARAMS: {({**MODEL_PARAMS, **model_params})}")
+        print(f"Best FEATURE_PARAMS: {feature_params}")
@@ -0,0 +1,136 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from artifacts import ARTIFACT_DIR, load_artifacts
+from dataset import DATE_FORMATS, parse_date
+from features import feature_columns
+from whatif import score_lineups
+
+DEFAULT_PORT = 8014
+
+
+class Predictor:
+    """Saved model + feature state held in memory, scored without touching the CSV."""
+
+    def __init__(self, directory=ARTIFACT_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        clf, state, meta = load_artifacts(self.directory)
+        # Single-row requests are faster without the joblib thread pool
+        clf.n_jobs = 1
+        with self.lock:
+            self.clf, self.state, self.meta = clf, state, meta
+
+    def predict(self, fixtures):
+        """fixtures: list of dicts with date, home_team, away_team and optional lineups."""
+        frame = fixtures_frame(fixtures)
+        with self.lock:
+            clf, state = self.clf, self.state
+        X = state.features(frame, sequential=False)
+        probs = clf.predict_proba(X[feature_columns(state.params)])[:, 1]
+        return [
+            {'date': f['Date'].strftime(DATE_FORMATS[0]), 'home_team': f['Home_Team'], 'away_team': f['Away_Team'],
+             'home_win_probability': float(p)}
+            for f, p in zip(frame.to_dict('records'), probs)
+        ]
+
+    def whatif(self, fixture, home_lineups, away_lineups):
+        with self.lock:
+            clf, state = self.clf, self.state
+        return score_lineups(clf, state, fixture, home_lineups, away_lineups).tolist()
+
+
+def fixtures_frame(fixtures):
+    def lineup(value):
+        if value is None:
+            return np.nan
+        return ", ".join(value) if isinstance(value, list) else value
+
+    if not fixtures:
+        raise ValueError("No fixtures to score: send one fixture or a non-empty \"fixtures\" list.")
+    try:
+        frame = pd.DataFrame({
+            'Date': [parse_date(f['date']) for f in fixtures],
+            'Home_Team': [f['home_team'] for f in fixtures],
+            'Away_Team': [f['away_team'] for f in fixtures],
+            'Home_Lineup': [lineup(f.get('home_lineup')) for f in fixtures],
+            'Away_Lineup': [lineup(f.get('away_lineup')) for f in fixtures],
+        })
+    except KeyError as e:
+        raise ValueError(f"Fixture is missing {e}") from e
+    return frame
+
+
+class Handler(BaseHTTPRequestHandler):
+    predictor = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'artifacts': self.predictor.meta})
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+
+            if self.path == '/predict':
+                # Either one fixture or {"fixtures": [...]}
+                fixtures = request['fixtures'] if 'fixtures' in request else [request]
+                predictions = self.predictor.predict(fixtures)
+                self._send(200, {'predictions': predictions, 'elapsed_ms': (time.perf_counter() - start) * 1000})
+            elif self.path == '/whatif':
+                # {"fixture": {...}, "home_lineups": [[...], ...], "away_lineups": [...]}
+                probs = self.predictor.whatif(request['fixture'], request['home_lineups'], request['away_lineups'])
+                self._send(200, {'home_win_probabilities': probs, 'elapsed_ms': (time.perf_counter() - start) * 1000})
+            elif self.path == '/reload':
+                self.predictor.reload()
+                self._send(200, {'status': 'reloaded', 'artifacts': self.predictor.meta})
+            else:
+                self._send(404, {'error': 'not found'})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, directory=ARTIFACT_DIR):
+    Handler.predictor = Predictor(directory)
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving predictions on http://{host}:{port} (state as of {Handler.predictor.meta['state_as_of']})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local prediction service (run 'python predictor.py retrain' first).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--artifacts', default=ARTIFACT_DIR)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.artifacts)
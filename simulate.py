@@ -0,0 +1,230 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from artifacts import ARTIFACT_DIR, load_artifacts
+from features import DATA_FILE, feature_columns, load_matches
+
+SIM_FILE = 'season_simulation.csv'
+
+# Top 14 table: 4 points a win, 2 a draw; +1 for scoring 3 tries more than
+# the opponent, +1 for losing by 5 points or fewer
+WIN_PTS, DRAW_PTS = 4, 2
+OFFENSIVE_TRY_MARGIN = 3
+DEFENSIVE_SCORE_MARGIN = 5
+
+PLAYOFF_SPOTS = 6     # Top 6 reach the barrages/semi-finals
+SEMI_FINAL_SPOTS = 2  # Top 2 go straight to the semi-finals
+ACCESS_SPOT = 13      # 13th plays the access match against the Pro D2 finalist
+
+
+# Regular-season matchdays (j1..j26); playoff and access-match phases don't count towards the table
+REGULAR_PHASE = r'^j\d+$'
+
+
+def regular_season(df, season=None):
+    """Rows of the regular-season rounds, optionally of one season only."""
+    rows = df['Phase'].astype(str).str.match(REGULAR_PHASE)
+    if season is not None:
+        rows &= df['Season'] == season
+    return df[rows]
+
+
+def table_points(h_score, a_score, h_tries, a_tries):
+    """(home_points, away_points) under the Top 14 rules. Works on scalars or arrays."""
+    margin = h_score - a_score
+    try_diff = h_tries - a_tries
+    h_pts = np.where(margin > 0, WIN_PTS, np.where(margin == 0, DRAW_PTS, 0))
+    a_pts = np.where(margin < 0, WIN_PTS, np.where(margin == 0, DRAW_PTS, 0))
+    h_pts = h_pts + ((margin > 0) & (try_diff >= OFFENSIVE_TRY_MARGIN)) + ((margin < 0) & (-margin <= DEFENSIVE_SCORE_MARGIN))
+    a_pts = a_pts + ((margin < 0) & (-try_diff >= OFFENSIVE_TRY_MARGIN)) + ((margin > 0) & (margin <= DEFENSIVE_SCORE_MARGIN))
+    return h_pts, a_pts
+
+
+def current_table(season_df, teams):
+    """Points and points difference from the season's finished regular-season games."""
+    season_df = regular_season(season_df)
+    done = season_df[season_df['Winner'].notna()]
+    h_tries = done['Home_Tries Scored'].fillna(0).to_numpy()
+    a_tries = done['Away_Tries Scored'].fillna(0).to_numpy()
+    h_pts, a_pts = table_points(done['Home_Score'].to_numpy(), done['Away_Score'].to_numpy(), h_tries, a_tries)
+
+    team_id = {t: i for i, t in enumerate(teams)}
+    points = np.zeros(len(teams))
+    diff = np.zeros(len(teams))
+    h = done['Home_Team'].map(team_id).to_numpy(dtype=int)
+    a = done['Away_Team'].map(team_id).to_numpy(dtype=int)
+    margin = (done['Home_Score'] - done['Away_Score']).to_numpy()
+    np.add.at(points, h, h_pts)
+    np.add.at(points, a, a_pts)
+    np.add.at(diff, h, margin)
+    np.add.at(diff, a, -margin)
+    return points, diff
+
+
+def result_pool(df):
+    """
+    Historical decided games as (winning margin, winner's try difference),
+    sampled to turn a simulated winner into bonus points and points difference.
+    """
+    decided = df[df['Winner'].notna() & (df['Home_Score'] != df['Away_Score'])].dropna(subset=['Home_Tries Scored', 'Away_Tries Scored'])
+    margin = (decided['Home_Score'] - decided['Away_Score']).to_numpy()
+    try_diff = (decided['Home_Tries Scored'] - decided['Away_Tries Scored']).to_numpy()
+    sign = np.sign(margin)
+    return np.abs(margin).astype(np.int16), (try_diff * sign).astype(np.int16)
+
+
+def remaining_fixtures(df, season):
+    """
+    Unplayed regular-season fixtures: scraped rows without a result, plus any
+    home/away pairing of the double round-robin not scraped yet (dated one
+    week after the season's last known game).
+    """
+    season_df = regular_season(df, season)
+    teams = sorted(set(season_df['Home_Team']) | set(season_df['Away_Team']))
+    scheduled = season_df[season_df['Winner'].isna()][['Date', 'Home_Team', 'Away_Team', 'Home_Lineup', 'Away_Lineup']]
+
+    seen = set(zip(season_df['Home_Team'], season_df['Away_Team']))
+    missing = [(h, a) for h in teams for a in teams if h != a and (h, a) not in seen]
+    unscheduled = pd.DataFrame(missing, columns=['Home_Team', 'Away_Team'])
+    unscheduled['Date'] = season_df['Date'].max() + pd.Timedelta(days=7)
+    unscheduled['Home_Lineup'] = np.nan
+    unscheduled['Away_Lineup'] = np.nan
+    return pd.concat([scheduled, unscheduled], ignore_index=True), teams
+
+
+def latest_lineups(df):
+    """Most recent lineup string fielded by each team (home or away)."""
+    long = pd.concat([
+        df[['Date', 'Home_Team', 'Home_Lineup']].set_axis(['Date', 'Team', 'Lineup'], axis=1),
+        df[['Date', 'Away_Team', 'Away_Lineup']].set_axis(['Date', 'Team', 'Lineup'], axis=1),
+    ]).dropna(subset=['Lineup']).sort_values('Date', kind='stable')
+    return long.groupby('Team')['Lineup'].last()
+
+
+def fixture_probabilities(fixtures, df, directory):
+    """Home win probability per fixture from the saved model; missing lineups use each team's latest one."""
+    clf, state, _ = load_artifacts(directory)
+    last = latest_lineups(df)
+    fixtures = fixtures.copy()
+    fixtures['Home_Lineup'] = fixtures['Home_Lineup'].fillna(fixtures['Home_Team'].map(last))
+    fixtures['Away_Lineup'] = fixtures['Away_Lineup'].fillna(fixtures['Away_Team'].map(last))
+    X = state.features(fixtures, sequential=False)
+    return clf.predict_proba(X[feature_columns(state.params)])[:, list(clf.classes_).index(1)]
+
+
+def simulate_chunk(args):
+    """Final positions (n_sims x n_teams, 1 = top) for one chunk of simulations."""
+    n_sims, seed, p_home, p_draw, home, away, base_points, base_diff, pool_margin, pool_tries = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+    n_fix = len(p_home)
+
+    # Outcome per (simulation, fixture): 0 home win, 1 draw, 2 away win
+    u = rng.random((n_sims, n_fix), dtype=np.float32)
+    home_win = u < p_home
+    draw = ~home_win & (u < p_home + p_draw)
+    away_win = ~home_win & ~draw
+
+    # Margin and winner's try difference drawn jointly from past results
+    k = rng.integers(0, len(pool_margin), size=(n_sims, n_fix))
+    margin = pool_margin[k]
+    try_diff = pool_tries[k]
+
+    winner_pts = WIN_PTS + (try_diff >= OFFENSIVE_TRY_MARGIN)
+    loser_pts = (margin <= DEFENSIVE_SCORE_MARGIN).astype(np.int8)
+    h_pts = np.where(home_win, winner_pts, np.where(draw, DRAW_PTS, loser_pts)).astype(np.float32)
+    a_pts = np.where(away_win, winner_pts, np.where(draw, DRAW_PTS, loser_pts)).astype(np.float32)
+    h_margin = np.where(home_win, margin, np.where(draw, 0, -margin)).astype(np.float32)
+
+    # Fixture -> team incidence matrices turn per-fixture results into table totals
+    H = np.zeros((n_fix, n_teams), dtype=np.float32)
+    A = np.zeros((n_fix, n_teams), dtype=np.float32)
+    H[np.arange(n_fix), home] = 1
+    A[np.arange(n_fix), away] = 1
+    points = base_points + h_pts @ H + a_pts @ A
+    diff = base_diff + h_margin @ H - h_margin @ A
+
+    # Rank on points, then points difference, then coin flip
+    key = points.astype(np.float64) * 1e5 + diff + rng.random((n_sims, n_teams)) * 0.5
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, n_teams + 1), axis=1)
+    return positions
+
+
+def simulate_season(fixtures, probs, teams, base_points, base_diff, pool, n_sims=100_000,
+                    draw_rate=0.02, workers=1, chunk=20_000, seed=1):
+    """
+    Monte Carlo over the remaining fixtures. Returns a (n_sims x n_teams)
+    matrix of final positions. Chunks run in a process pool when workers > 1.
+    """
+    team_id = {t: i for i, t in enumerate(teams)}
+    home = fixtures['Home_Team'].map(team_id).to_numpy(dtype=int)
+    away = fixtures['Away_Team'].map(team_id).to_numpy(dtype=int)
+    # draw_rate is taken from both sides in proportion to their win probabilities
+    p_draw = np.full(len(fixtures), np.clip(draw_rate, 0, 1), dtype=np.float32)
+    p_home = (np.asarray(probs, dtype=np.float32) * (1 - p_draw)).astype(np.float32)
+
+    sizes = [min(chunk, n_sims - i) for i in range(0, n_sims, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(n, s, p_home, p_draw, home, away, base_points, base_diff, *pool) for n, s in zip(sizes, seeds)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(simulate_chunk, tasks))
+    else:
+        parts = [simulate_chunk(t) for t in tasks]
+    return np.concatenate(parts)
+
+
+def summarize(positions, teams, base_points):
+    n_teams = len(teams)
+    table = pd.DataFrame({'Team': teams, 'Current_Points': base_points})
+    table['Expected_Position'] = positions.mean(axis=0)
+    table['Top_2'] = (positions <= SEMI_FINAL_SPOTS).mean(axis=0)
+    table['Top_6'] = (positions <= PLAYOFF_SPOTS).mean(axis=0)
+    table['Access_Match'] = (positions == ACCESS_SPOT).mean(axis=0)
+    table['Relegated'] = (positions == n_teams).mean(axis=0)
+    for pos in range(1, n_teams + 1):
+        table[f'P{pos}'] = (positions == pos).mean(axis=0)
+    return table.sort_values('Expected_Position').reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the rest of a Top 14 season.")
+    parser.add_argument('--season', default='2025-2026')
+    parser.add_argument('--sims', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1, help="Process pool size (default: 1)")
+    parser.add_argument('--artifacts', default=ARTIFACT_DIR)
+    parser.add_argument('--output', default=SIM_FILE)
+    args = parser.parse_args()
+
+    df = load_matches(DATA_FILE)
+    fixtures, teams = remaining_fixtures(df, args.season)
+    if fixtures.empty:
+        print(f"No fixtures left in {args.season}.")
+        raise SystemExit
+
+    print(f"Scoring {len(fixtures)} remaining fixtures...")
+    probs = fixture_probabilities(fixtures, df, args.artifacts)
+
+    season_df = regular_season(df, args.season)
+    base_points, base_diff = current_table(season_df, teams)
+    draw_rate = (df['Winner'] == 'Draw').sum() / df['Winner'].notna().sum()
+
+    start = time.perf_counter()
+    positions = simulate_season(fixtures, probs, teams, base_points, base_diff, result_pool(df),
+                                n_sims=args.sims, draw_rate=draw_rate, workers=args.workers)
+    print(f"Simulated {args.sims} seasons in {time.perf_counter() - start:.1f}s")
+
+    table = summarize(positions, teams, base_points)
+    pd.set_option('display.width', 1000)
+    cols = ['Team', 'Current_Points', 'Expected_Position', 'Top_2', 'Top_6', 'Access_Match', 'Relegated']
+    print(table[cols].to_string(index=False, float_format='{:.3f}'.format))
+    table.to_csv(args.output, index=False)
+    print(f"\nSaved to '{args.output}'")
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from features import FEATURE_PARAMS, feature_columns
+from form import TeamForm, form_specs, game_results
+from player_strength import PlayerIndex, PlayerStrengthEngine, match_points
+from ratings import TeamRatings
+
+
+def match_keys(df):
+    """One 'Season|Phase|Home_Team' string per row, the scrape's unique match key."""
+    return (df['Season'].astype(str) + '|' + df['Phase'].astype(str) + '|' + df['Home_Team'].astype(str)).tolist()
+
+
+class MatchState:
+    """
+    Feature-engineering state after a run of finished games: each team's
+    TeamForm (recent results, EWMA sums, last match date) and Elo rating,
+    plus every player's rating, and the keys of the matches folded in.
+    It is enough to build features for upcoming fixtures without the history.
+    """
+
+    def __init__(self, params=FEATURE_PARAMS):
+        self.params = dict(params)
+        self.teams = {}  # team -> TeamForm
+        self.players = PlayerIndex()
+        self.engine = PlayerStrengthEngine(C=params['C'], global_mean=0.5, decay=params['decay'])
+        self.ratings = TeamRatings.from_params(params)
+        self.applied = set()  # match_keys of every finished game in the state
+        self.last_match_date = None
+
+    @classmethod
+    def from_matches(cls, df, params=FEATURE_PARAMS, lineups=None):
+        """State after every finished game of df. `lineups` (a LineupMatrix aligned with df) skips string parsing."""
+        state = cls(params)
+        if lineups is None:
+            state.apply(df[df['Winner'].notna()])
+            return state
+
+        finished = df['Winner'].notna().to_numpy()
+        state._apply_teams(df[finished])
+        state.players = PlayerIndex.from_names(lineups.index.names)
+        h_ids, h_off, _ = lineups.home
+        a_ids, a_off, _ = lineups.away
+        h_pts, a_pts = match_points(df)
+        state.engine.reserve(len(state.players) + 1)
+        state.engine.update(*state.engine.appearances(h_ids, h_off, a_ids, a_off, h_pts, a_pts, finished, 0, len(df)))
+        return state
+
+    def apply(self, matches):
+        """Folds finished matches (chronological order) into the state, O(1) per match."""
+        if matches.empty:
+            return
+        self._apply_teams(matches)
+
+        # Player memory: no reads in between, so one vectorized update is exact
+        h_ids, h_off, _ = self.players.parse(matches['Home_Lineup'])
+        a_ids, a_off, _ = self.players.parse(matches['Away_Lineup'])
+        self.engine.reserve(len(self.players) + 1)
+        h_pts, a_pts = match_points(matches)
+        finished = np.ones(len(matches), dtype=bool)
+        self.engine.update(*self.engine.appearances(h_ids, h_off, a_ids, a_off, h_pts, a_pts, finished, 0, len(matches)))
+
+    def _apply_teams(self, matches):
+        if 'Season' in matches:
+            self.applied.update(match_keys(matches))
+        for date, home, away, h_score, a_score in matches[['Date', 'Home_Team', 'Away_Team', 'Home_Score', 'Away_Score']].itertuples(index=False):
+            for team, score, opp in ((home, h_score, a_score), (away, a_score, h_score)):
+                points, diff = game_results(float(score), float(opp))
+                self.team(team).push(date, float(points), diff)
+            self.ratings.update(home, away, float(h_score), float(a_score), date)
+
+        self.last_match_date = max(self.last_match_date, matches['Date'].max()) if self.last_match_date is not None else matches['Date'].max()
+
+    def pending(self, df):
+        """Finished rows of df (a load_matches frame) not folded into the state yet."""
+        keys = np.array(match_keys(df), dtype=object)
+        new = df['Winner'].notna().to_numpy() & ~np.isin(keys, list(self.applied))
+        return df[new]
+
+    def team(self, name):
+        if name not in self.teams:
+            self.teams[name] = TeamForm(self.params)
+        return self.teams[name]
+
+    def lineup_strength(self, lineups):
+        """Strength of each lineup string; players never seen before count as the global mean."""
+        ids, offsets, present = self.players.lookup(lineups)
+        self.engine.reserve(len(self.players) + 1)
+        return self.engine.strength(ids, offsets, present)
+
+    def features(self, fixtures, sequential=True):
+        """
+        Model features for upcoming fixtures (Date, Home_Team, Away_Team,
+        Home_Lineup, Away_Lineup). Rest days count from the team's previous
+        fixture; form only uses finished games. With sequential=False every
+        fixture is scored on its own against the state (for what-if queries
+        that repeat the same teams).
+        """
+        original_index = fixtures.index
+        fixtures = fixtures.sort_values('Date', kind='stable')
+        rows = {'H': [], 'A': []}
+        elo = []
+        last_date = {name: form.last_date for name, form in self.teams.items()}
+
+        for date, home, away in fixtures[['Date', 'Home_Team', 'Away_Team']].itertuples(index=False):
+            elo.append(self.ratings.pre_match(home, away, date))
+            for side, team in (('H', home), ('A', away)):
+                prev = last_date.get(team)
+                values = (self.teams.get(team) or TeamForm(self.params)).values()
+                values['Rest_Days'] = (date - prev).days if prev is not None else self.params['rest_default']
+                rows[side].append(values)
+            if sequential:
+                for team in (home, away):
+                    last_date[team] = date
+
+        out = pd.concat([pd.DataFrame(rows[side], index=fixtures.index).add_prefix(f'{side}_') for side in ('H', 'A')], axis=1)
+        out = out.assign(**self.ratings.columns(elo))
+        out['H_Lineup_Strength'] = self.lineup_strength(fixtures['Home_Lineup'])
+        out['A_Lineup_Strength'] = self.lineup_strength(fixtures['Away_Lineup'])
+
+        # Feature diffs usually correlate better than raw values
+        out['Strength_Diff'] = out['H_Lineup_Strength'] - out['A_Lineup_Strength']
+        out['Rest_Diff'] = out['H_Rest_Days'] - out['A_Rest_Days']
+        out['Form_Point_Diff'] = out['H_Form_Points'] - out['A_Form_Points']
+        return out[feature_columns(self.params)].reindex(original_index)
+
+    # ---------------------------------------------------------
+    # PERSISTENCE
+    # ---------------------------------------------------------
+
+    def to_arrays(self):
+        names = sorted(self.teams)
+        forms = [self.teams[t] for t in names]
+        max_window = max(arg for _, kind, arg in form_specs(self.params) if kind == 'window')
+        # Pad each team's results to max_window rows; counts says how many are real
+        results = np.zeros((len(names), max_window, 2))
+        counts = np.zeros(len(names), dtype=np.int64)
+        for i, form in enumerate(forms):
+            r = list(form.results)
+            counts[i] = len(r)
+            if r:
+                results[i, :len(r)] = r
+        n = len(self.players)
+        return {
+            'teams': np.array(names, dtype=str),
+            'team_results': results,
+            'team_counts': counts,
+            'team_ewm': np.array([f.ewm for f in forms]).reshape(len(names), -1, 3),
+            'team_last_date': np.array([f.last_date for f in forms], dtype='datetime64[ns]'),
+            'players': np.array(self.players.names, dtype=str),
+            'sum_pts': self.engine.sum_pts[:n],
+            'games': self.engine.games[:n],
+            **self.ratings.to_arrays(),
+            'applied': np.array(sorted(self.applied), dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        state = cls(params)
+        for name, results, count, ewm, last in zip(arrays['teams'], arrays['team_results'], arrays['team_counts'],
+                                                   arrays['team_ewm'], arrays['team_last_date']):
+            form = state.team(str(name))
+            form.results.extend(tuple(r) for r in results[:count])
+            form.ewm[:] = ewm
+            form.last_date = pd.Timestamp(last)
+        for name in arrays['players']:
+            state.players.intern(str(name))
+        n = len(state.players)
+        state.engine.reserve(n + 1)
+        state.engine.sum_pts[:n] = arrays['sum_pts']
+        state.engine.games[:n] = arrays['games']
+        state.ratings.load_arrays(arrays)
+        state.applied = set(arrays['applied'].tolist())
+        if state.teams:
+            state.last_match_date = max(f.last_date for f in state.teams.values())
+        return state
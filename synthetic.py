@@ -0,0 +1,156 @@
+import argparse
+import numpy as np
+import pandas as pd
+from dataset import CORE_COLUMNS, LINEUP_COLUMNS
+
+# Per-team stats in scrape order; each side gets Home_<stat> / Away_<stat>
+STATS = ['Tries Scored', 'Possession (%)', 'Territory (%)', 'Scrums Won', 'Lineouts Won (Own)',
+         'Penalties Scored', 'Penalties Conceded', 'Tackles Completed', 'Missed Tackles']
+COLUMNS = CORE_COLUMNS + LINEUP_COLUMNS + [f'{side}_{s}' for s in STATS for side in ('Home', 'Away')]
+
+KICKOFFS = ['21h05', '17h00', '15h00', '16h30', '16h35']
+LINEUP_SIZE = 23
+
+
+def round_robin(n_teams):
+    """Double round-robin (circle method): one list of (home, away) index pairs per matchday."""
+    teams = list(range(n_teams + n_teams % 2))
+    half = len(teams) // 2
+    first = []
+    for _ in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(half)]
+        first.append([p for p in pairs if max(p) < n_teams])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    # Alternate home/away in the first leg, mirror it in the second
+    first = [[(a, b) if r % 2 else (b, a) for a, b in day] for r, day in enumerate(first)]
+    return first + [[(b, a) for a, b in day] for day in first]
+
+
+def generate_league(teams=14, seasons=6, squad_size=40, turnover=0.25, transfer_share=0.5,
+                    future_rounds=1, start_year=2020, seed=0):
+    """
+    Synthetic league history in the Top14_Raw_Scrape.csv schema (same
+    columns and text formats), regular seasons only.
+
+    Each club has a squad of `squad_size` players with a hidden skill. A
+    lineup is 23 of them, biased towards the better ones, and the result
+    depends on the two lineups, a club effect and home advantage, so the
+    features carry real signal. Between seasons `turnover` of each squad is
+    replaced: `transfer_share` of the replacements are signed from other
+    clubs, the rest are new players. The last `future_rounds` matchdays of
+    the final season are left unplayed (no score, stats or winner).
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Club {i + 1:02d}" for i in range(teams)]
+    referees = [f"Referee {i + 1:02d}" for i in range(max(8, teams + 6))]
+    club_effect = rng.normal(0, 0.3, teams)
+
+    n_players = teams * squad_size
+    skill = list(rng.normal(0, 1, n_players))
+    squads = [list(range(t * squad_size, (t + 1) * squad_size)) for t in range(teams)]
+    schedule = round_robin(teams)
+
+    def player_name(pid):
+        return f"Player{pid} SYNTH{pid}"
+
+    def lineup(team):
+        squad = np.array(squads[team])
+        # Coaches pick the best players, with rotation noise
+        order = np.argsort(-(np.array([skill[p] for p in squad]) + rng.gumbel(0, 0.7, len(squad))))
+        picked = squad[order[:LINEUP_SIZE]]
+        return picked, ", ".join(player_name(p) for p in picked)
+
+    rows = []
+    for s in range(seasons):
+        year = start_year + s
+        if s > 0:
+            # Off-season: each club loses `turnover` of its squad
+            leaving = [list(rng.choice(squad, int(round(turnover * squad_size)), replace=False)) for squad in squads]
+            pool = [p for out in leaving for p in out]
+            rng.shuffle(pool)
+            for t, out in enumerate(leaving):
+                out = set(out)
+                signings = []
+                for _ in out:
+                    # Sign someone another club let go, or bring in a new player
+                    p = next((p for p in pool if p not in out), None) if rng.random() < transfer_share else None
+                    if p is None:
+                        p = len(skill)
+                        skill.append(rng.normal(0, 1))
+                    else:
+                        pool.remove(p)
+                    signings.append(p)
+                squads[t] = [p for p in squads[t] if p not in out] + signings
+            club_effect = 0.7 * club_effect + rng.normal(0, 0.15, teams)
+
+        first_day = pd.Timestamp(year, 9, 1) + pd.offsets.Week(weekday=5)
+        last_season = s == seasons - 1
+        for r, day in enumerate(schedule):
+            date = (first_day + pd.Timedelta(weeks=r + (r >= len(schedule) // 2) * 2)).strftime('%d/%m/%Y')
+            played = not (last_season and r >= len(schedule) - future_rounds)
+            for home, away in day:
+                h_ids, h_lineup = lineup(home)
+                a_ids, a_lineup = lineup(away)
+                row = {
+                    'Season': f"{year}-{year + 1}", 'Phase': f"j{r + 1}", 'Date': date,
+                    'Time': KICKOFFS[rng.integers(len(KICKOFFS))],
+                    'Home_Team': names[home], 'Away_Team': names[away],
+                    'Home_Score': 0, 'Away_Score': 0, 'Winner': None,
+                    'Referee': referees[rng.integers(len(referees))],
+                    'Home_Lineup': h_lineup, 'Away_Lineup': a_lineup,
+                }
+                if played:
+                    edge = (np.mean([skill[p] for p in h_ids[:15]]) - np.mean([skill[p] for p in a_ids[:15]])
+                            + club_effect[home] - club_effect[away] + 0.35)
+                    h_tries = rng.poisson(max(0.3, 2.6 + 1.5 * edge))
+                    a_tries = rng.poisson(max(0.3, 2.6 - 1.5 * edge))
+                    h_pens, a_pens = rng.poisson(2.3, 2)
+                    h_score = 5 * h_tries + 2 * rng.binomial(h_tries, 0.75) + 3 * h_pens
+                    a_score = 5 * a_tries + 2 * rng.binomial(a_tries, 0.75) + 3 * a_pens
+                    possession = int(np.clip(round(rng.normal(50 + 3 * edge, 4)), 30, 70))
+                    territory = int(np.clip(round(rng.normal(50 + 5 * edge, 7)), 25, 75))
+                    h_tackles, a_tackles = rng.normal(115, 30, 2).clip(40).round()
+                    stats = {
+                        'Tries Scored': (h_tries, a_tries),
+                        'Possession (%)': (possession, 100 - possession),
+                        'Territory (%)': (territory, 100 - territory),
+                        'Scrums Won': tuple(rng.poisson(5.4, 2)),
+                        'Lineouts Won (Own)': tuple(rng.poisson(11, 2)),
+                        'Penalties Scored': (h_pens, a_pens),
+                        'Penalties Conceded': tuple(rng.poisson(11, 2)),
+                        'Tackles Completed': (h_tackles, a_tackles),
+                        'Missed Tackles': tuple(rng.poisson(19, 2)),
+                    }
+                    row.update({
+                        'Home_Score': h_score, 'Away_Score': a_score,
+                        'Winner': names[home] if h_score > a_score else (names[away] if a_score > h_score else 'Draw'),
+                    })
+                    for stat, (h, a) in stats.items():
+                        # The scrape stores stats as floats ("3.0")
+                        row[f'Home_{stat}'] = float(h)
+                        row[f'Away_{stat}'] = float(a)
+                rows.append(row)
+
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic league in the scrape's CSV schema.")
+    parser.add_argument('--teams', type=int, default=14)
+    parser.add_argument('--seasons', type=int, default=6)
+    parser.add_argument('--squad-size', type=int, default=40)
+    parser.add_argument('--turnover', type=float, default=0.25, help="Share of each squad replaced every off-season")
+    parser.add_argument('--transfer-share', type=float, default=0.5, help="Share of replacements signed from other clubs")
+    parser.add_argument('--future-rounds', type=int, default=1, help="Unplayed matchdays at the end of the last season")
+    parser.add_argument('--start-year', type=int, default=2020)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='Synthetic_Raw_Scrape.csv')
+    args = parser.parse_args()
+
+    df = generate_league(args.teams, args.seasons, args.squad_size, args.turnover, args.transfer_share,
+                         args.future_rounds, args.start_year, args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Saved {len(df)} matches ({args.teams} teams, {args.seasons} seasons) to '{args.output}'")
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+from feature_store import FeatureStore, store_columns
+from features import FEATURE_PARAMS, build_features, feature_columns, load_matches
+from form import compute_form
+from player_strength import PlayerStrengthEngine
+from synthetic import generate_league
+
+PARAMS = {**FEATURE_PARAMS, 'extra_windows': [3], 'ewm_alphas': [0.3]}
+
+
+@pytest.fixture(scope='module')
+def league():
+    # Transfers between clubs, and two unplayed matchdays at the end
+    return generate_league(teams=8, seasons=3, squad_size=30, future_rounds=2, seed=7)
+
+
+@pytest.fixture
+def matches(league, tmp_path):
+    path = tmp_path / 'league.csv'
+    league.to_csv(path, index=False)
+    return load_matches(str(path))
+
+
+# ---------------------------------------------------------
+# REFERENCE IMPLEMENTATIONS (one row at a time)
+# ---------------------------------------------------------
+
+def reference_player_strength(df, C, decay, global_mean=0.5):
+    """The original iterrows loop: score both lineups, then update memory if the game was played."""
+    stats = {}
+
+    def strength(lineup):
+        if pd.isna(lineup):
+            return global_mean
+        scores = [(s + C * global_mean) / (g + C) for s, g in
+                  (stats.get(p.strip(), (0.0, 0.0)) for p in str(lineup).split(','))]
+        return np.mean(scores) if scores else global_mean
+
+    def update(lineup, points):
+        if pd.isna(lineup):
+            return
+        for p in (x.strip() for x in str(lineup).split(',')):
+            s, g = stats.get(p, (0.0, 0.0))
+            stats[p] = (s * decay + points, g * decay + 1)
+
+    home, away = [], []
+    for _, row in df.iterrows():
+        home.append(strength(row['Home_Lineup']))
+        away.append(strength(row['Away_Lineup']))
+        if pd.isna(row['Winner']):
+            continue
+        h_pts = 1.0 if row['Winner'] == row['Home_Team'] else (0.5 if row['Winner'] == 'Draw' else 0.0)
+        update(row['Home_Lineup'], h_pts)
+        update(row['Away_Lineup'], 1.0 - h_pts)
+    return np.array(home), np.array(away)
+
+
+def reference_form(df, params):
+    """Rest days and form per team, walking each team's games in order; only finished games count as form."""
+    out = {}
+    history = {}  # team -> (last date, [(points, diff), ...])
+    for i, row in enumerate(df.itertuples(index=False)):
+        sides = (('H', row.Home_Team, row.Home_Score, row.Away_Score), ('A', row.Away_Team, row.Away_Score, row.Home_Score))
+        for side, team, score, opp in sides:
+            last, results = history.get(team, (None, []))
+            values = {'Rest_Days': (row.Date - last).days if last is not None else params['rest_default']}
+            for window, suffix in [(params['window'], '')] + [(w, f'_w{w}') for w in params['extra_windows']]:
+                recent = results[-window:]
+                values[f'Form_Points{suffix}'] = np.mean([r[0] for r in recent]) if recent else 0.0
+                values[f'Form_Diff{suffix}'] = np.mean([r[1] for r in recent]) if recent else 0.0
+            for alpha in params['ewm_alphas']:
+                weights = (1 - alpha) ** np.arange(len(results))[::-1]
+                for k, m in enumerate(('Points', 'Diff')):
+                    values[f'Form_{m}_ewm{alpha:g}'] = (np.dot(weights, [r[k] for r in results]) / weights.sum()
+                                                        if results else 0.0)
+            for name, v in values.items():
+                out.setdefault(f'{side}_{name}', np.zeros(len(df)))[i] = v
+        for side, team, score, opp in sides:
+            last, results = history.get(team, (None, []))
+            if not pd.isna(row.Winner):
+                results = results + [(1.0 if score > opp else 0.5 if score == opp else 0.0, float(score - opp))]
+            history[team] = (row.Date, results)
+    return out
+
+
+# ---------------------------------------------------------
+# TESTS
+# ---------------------------------------------------------
+
+def test_player_strength_engine_matches_row_loop(matches):
+    for C, decay in [(5, 0.99), (2, 1.0)]:
+        h, a, _ = PlayerStrengthEngine(C=C, global_mean=0.5, decay=decay).run(matches)
+        ref_h, ref_a = reference_player_strength(matches, C, decay)
+        np.testing.assert_allclose(h, ref_h, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(a, ref_a, rtol=0, atol=1e-12)
+
+
+def test_compute_form_matches_per_team_walk(matches):
+    form = compute_form(matches, PARAMS)
+    reference = reference_form(matches, PARAMS)
+    assert set(form) == set(reference)
+    for name in reference:
+        np.testing.assert_allclose(form[name], reference[name], rtol=0, atol=1e-9, err_msg=name)
+
+
+def _assert_same_features(stored, fresh, params):
+    fresh = fresh[store_columns(params)]
+    assert len(stored) == len(fresh)
+    for c in ['Home_Team', 'Away_Team']:
+        assert (stored[c].astype(str).to_numpy() == fresh[c].astype(str).to_numpy()).all()
+    np.testing.assert_array_equal(stored['Date'].to_numpy(), fresh['Date'].to_numpy())
+    np.testing.assert_allclose(stored[feature_columns(params) + ['Target']].to_numpy(dtype=float),
+                               fresh[feature_columns(params) + ['Target']].to_numpy(dtype=float), rtol=0, atol=1e-12)
+
+
+def test_feature_store_incremental_matches_full_build(league, tmp_path, capsys):
+    path = str(tmp_path / 'league.csv')
+    store = FeatureStore(str(tmp_path / 'feature_store'))
+
+    # First scrape: everything but the last season's second half
+    cut = len(league) - len(league) // 6
+    league.iloc[:cut].to_csv(path, index=False)
+    _assert_same_features(store.load(path, PARAMS), build_features(load_matches(path), PARAMS), PARAMS)
+
+    # New rows appended: only those are recomputed
+    league.to_csv(path, index=False)
+    capsys.readouterr()
+    stored = store.load(path, PARAMS)
+    assert f"recomputing {len(league) - cut} of {len(league)}" in capsys.readouterr().out
+    _assert_same_features(stored, build_features(load_matches(path), PARAMS), PARAMS)
+
+    # An early result corrected: everything from that date on is recomputed
+    edited = league.copy()
+    i = 10
+    edited.loc[i, ['Home_Score', 'Away_Score']] = edited.loc[i, ['Away_Score', 'Home_Score']].to_numpy()
+    h, a = edited.loc[i, 'Home_Score'], edited.loc[i, 'Away_Score']
+    edited.loc[i, 'Winner'] = edited.loc[i, 'Home_Team'] if h > a else (edited.loc[i, 'Away_Team'] if a > h else 'Draw')
+    edited.to_csv(path, index=False)
+    stored = store.load(path, PARAMS)
+    _assert_same_features(stored, build_features(load_matches(path), PARAMS), PARAMS)
+
+    # Unchanged CSV: straight from disk
+    capsys.readouterr()
+    _assert_same_features(store.load(path, PARAMS), build_features(load_matches(path), PARAMS), PARAMS)
+    assert "recomputing" not in capsys.readouterr().out
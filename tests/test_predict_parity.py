@@ -0,0 +1,29 @@
+import numpy as np
+from features import FEATURE_PARAMS, build_features, feature_columns, load_matches
+from models import make_model
+from predictor import score_fixtures, train_and_score
+from state import MatchState
+from synthetic import generate_league
+
+
+def test_saved_state_matches_full_rebuild_over_two_rounds(tmp_path):
+    # Two unplayed matchdays, so every team has a fixture after its next one
+    path = tmp_path / 'league.csv'
+    generate_league(teams=10, seasons=3, future_rounds=2, seed=5).to_csv(path, index=False)
+    df = load_matches(str(path))
+    features = feature_columns(FEATURE_PARAMS)
+
+    frame = build_features(df, FEATURE_PARAMS)
+    rebuilt = train_and_score(frame, features)
+    assert len(rebuilt) == 10
+
+    # Same model as train_and_score, scored from the saved-state path instead
+    train = frame[frame['Winner'].notna()].dropna(subset=features)
+    clf = make_model().fit(train[features], train['Target'])
+    state = MatchState.from_matches(df, FEATURE_PARAMS)
+    saved = score_fixtures(clf, state, df[df['Winner'].isna()])
+
+    key = ['Date', 'Home_Team', 'Away_Team']
+    rebuilt = rebuilt.sort_values(key)['Home_Win_Probability'].to_numpy()
+    saved = saved.sort_values(key)['Home_Win_Probability'].to_numpy()
+    np.testing.assert_allclose(saved, rebuilt, atol=1e-12)
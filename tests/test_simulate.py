@@ -0,0 +1,31 @@
+import pandas as pd
+from features import load_matches
+from simulate import current_table, remaining_fixtures
+from synthetic import generate_league
+
+
+def test_completed_season_has_no_fixtures_and_ignores_playoffs(tmp_path):
+    league = generate_league(teams=14, seasons=1, future_rounds=0, seed=3)
+    season = league['Season'].iloc[0]
+    last = league.iloc[-1]
+
+    # Playoffs after the regular season, including an access match against a Pro D2 side
+    playoffs = pd.DataFrame([
+        {**last, 'Phase': 'barrage', 'Home_Team': 'Club 03', 'Away_Team': 'Club 06', 'Home_Score': 30, 'Away_Score': 10, 'Winner': 'Club 03'},
+        {**last, 'Phase': 'finale', 'Home_Team': 'Club 01', 'Away_Team': 'Club 03', 'Home_Score': 25, 'Away_Score': 20, 'Winner': 'Club 01'},
+        {**last, 'Phase': 'access-top-14', 'Home_Team': 'Club 13', 'Away_Team': 'Pro D2 Club', 'Home_Score': 12, 'Away_Score': 15, 'Winner': 'Pro D2 Club'},
+    ])
+    path = tmp_path / 'league.csv'
+    pd.concat([league, playoffs], ignore_index=True).to_csv(path, index=False)
+    df = load_matches(str(path))
+
+    fixtures, teams = remaining_fixtures(df, season)
+    assert fixtures.empty
+    assert len(teams) == 14 and 'Pro D2 Club' not in teams
+
+    # Only regular-season results count towards the table
+    regular_path = tmp_path / 'regular.csv'
+    league.to_csv(regular_path, index=False)
+    points, diff = current_table(df[df['Season'] == season], teams)
+    expected_points, expected_diff = current_table(load_matches(str(regular_path)), teams)
+    assert (points == expected_points).all() and (diff == expected_diff).all()
@@ -0,0 +1,132 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+from features import DATA_FILE, FEATURE_PARAMS, feature_columns
+from feature_store import FeatureStore
+from models import make_model
+
+RESULTS_FILE = 'walk_forward_results.csv'
+
+# Feature matrix shared by every fold in a worker process (set once by _init_worker)
+_shared = {}
+
+
+def _init_worker(X, y):
+    _shared['X'] = X
+    _shared['y'] = y
+
+
+def make_folds(df, seasons=None, min_train=50):
+    """
+    One fold per matchday (Season, Phase), in the order the rounds started.
+    A fold trains on every finished game played before its first match and
+    tests on its own finished games.
+    """
+    finished = df['Winner'].notna().to_numpy()
+    dates = df['Date'].to_numpy()
+
+    rounds = df[finished].groupby(['Season', 'Phase'], sort=False, observed=True)['Date'].min().sort_values()
+    folds = []
+    for (season, phase), round_start in rounds.items():
+        if seasons and season not in seasons:
+            continue
+        train_idx = np.flatnonzero(finished & (dates < round_start.to_datetime64()))
+        test_idx = np.flatnonzero(finished & (df['Season'] == season).to_numpy() & (df['Phase'] == phase).to_numpy())
+        if len(train_idx) < min_train:
+            continue
+        folds.append({'Season': season, 'Phase': phase, 'Round_Start': round_start,
+                      'train_idx': train_idx, 'test_idx': test_idx})
+    return folds
+
+
+def run_fold(fold, model_params=None):
+    return fit_fold(_shared['X'], _shared['y'], fold, model_params)
+
+
+def fit_fold(X, y, fold, model_params=None):
+    """Fits one model on the fold's training rows and scores its test round."""
+    train_idx, test_idx = fold['train_idx'], fold['test_idx']
+
+    start = time.perf_counter()
+    clf = make_model(n_jobs=1, **(model_params or {}))
+    clf.fit(X[train_idx], y[train_idx])
+    probs = clf.predict_proba(X[test_idx])[:, list(clf.classes_).index(1)]
+    y_test = y[test_idx]
+
+    return {
+        'Season': fold['Season'],
+        'Phase': fold['Phase'],
+        'Round_Start': fold['Round_Start'],
+        'Train_Games': len(train_idx),
+        'Test_Games': len(test_idx),
+        'Accuracy': accuracy_score(y_test, probs > 0.5),
+        'Log_Loss': log_loss(y_test, probs, labels=[0, 1]),
+        'Brier': brier_score_loss(y_test, probs, pos_label=1),
+        'Fit_Seconds': time.perf_counter() - start,
+    }
+
+
+def walk_forward(df, seasons=None, workers=None, min_train=50, model_params=None):
+    """Retrains at every matchday on earlier data only. Returns one row per round."""
+    features = feature_columns(FEATURE_PARAMS)
+    df = df.dropna(subset=features).reset_index(drop=True)
+    folds = make_folds(df, seasons, min_train)
+    if not folds:
+        return pd.DataFrame()
+
+    X = df[features].to_numpy(dtype=np.float64)
+    y = df['Target'].fillna(-1).to_numpy(dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    print(f"Walk-forward: {len(folds)} rounds on {workers} worker(s)...")
+
+    if workers == 1:
+        _init_worker(X, y)
+        rows = [run_fold(f, model_params) for f in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+            rows = list(pool.map(run_fold, folds, [model_params] * len(folds)))
+
+    return pd.DataFrame(rows)
+
+
+def summarize(results):
+    """Per-season averages, weighting each round by its number of games."""
+    def agg(g):
+        w = g['Test_Games']
+        return pd.Series({
+            'Rounds': len(g),
+            'Games': w.sum(),
+            'Accuracy': np.average(g['Accuracy'], weights=w),
+            'Log_Loss': np.average(g['Log_Loss'], weights=w),
+            'Brier': np.average(g['Brier'], weights=w),
+        })
+    return results.groupby('Season').apply(agg)
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest: retrain at every matchday.")
+    parser.add_argument('--seasons', nargs='*', help="Seasons to score (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: all cores)")
+    parser.add_argument('--min-train', type=int, default=50, help="Skip rounds with fewer past games")
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    df = FeatureStore().load(DATA_FILE, FEATURE_PARAMS)
+
+    start = time.perf_counter()
+    results = walk_forward(df, args.seasons, args.workers, args.min_train)
+    if results.empty:
+        print("No rounds to score.")
+    else:
+        pd.set_option('display.width', 1000)
+        print(summarize(results).to_string(float_format='{:.3f}'.format))
+        print(f"\n{len(results)} rounds in {time.perf_counter() - start:.1f}s")
+        results.to_csv(args.output, index=False)
+        print(f"Saved per-round results to '{args.output}'")
@@ -0,0 +1,96 @@
+import argparse
+import time
+from artifacts import ARTIFACT_DIR, load_artifacts, save_state
+from features import DATA_FILE, file_hash, load_matches
+from lineups import load_lineups
+from predictor import report, retrain, score_fixtures
+from state import MatchState
+
+# Finished games since the last fit before the model is refitted (two rounds)
+RETRAIN_EVERY = 14
+PREDICTIONS_FILE = 'final_predictions.csv'
+
+
+class Watcher:
+    """
+    Keeps the saved model and state in memory and, each time the CSV
+    changes, folds the newly finished matches into the state (form, rest
+    days, player memory, Elo) and re-scores the upcoming fixtures. The model
+    is only refitted once `retrain_every` results have come in since the
+    last fit.
+    """
+
+    def __init__(self, filename=DATA_FILE, directory=ARTIFACT_DIR, retrain_every=RETRAIN_EVERY, output=PREDICTIONS_FILE):
+        self.filename = filename
+        self.directory = directory
+        self.retrain_every = retrain_every
+        self.output = output
+        self.csv_hash = None
+        self.clf, self.state, self.meta = load_artifacts(directory)
+
+    def check(self):
+        """Processes the CSV if it changed since the last call. Returns True if it did."""
+        csv_hash = file_hash(self.filename)
+        if csv_hash == self.csv_hash:
+            return False
+        start = time.perf_counter()
+
+        df = load_matches(self.filename)
+        new = self.state.pending(df)
+        finished = int(df['Winner'].notna().sum())
+
+        if finished - self.meta.get('train_games', 0) >= self.retrain_every:
+            print(f"{finished - self.meta.get('train_games', 0)} results since the last fit: retraining.")
+            self.clf, self.state, self.meta = retrain(self.filename, self.directory)
+        elif not new.empty:
+            if self.state.last_match_date is not None and new['Date'].min() < self.state.last_match_date:
+                # A result older than the state (e.g. a postponed game): replay everything
+                print(f"{len(new)} new results, some dated before {self.state.last_match_date.date()}: rebuilding state.")
+                self.state = MatchState.from_matches(df, self.state.params, load_lineups(self.filename, df))
+            else:
+                print(f"Applying {len(new)} new results to the saved state.")
+                self.state.apply(new)
+            self.meta = save_state(self.state, {**self.meta, 'csv_hash': csv_hash}, self.directory)
+        else:
+            print("No new results.")
+
+        fixtures = df[df['Winner'].isna()]
+        if fixtures.empty:
+            print("No upcoming fixtures to predict.")
+        else:
+            report(score_fixtures(self.clf, self.state, fixtures), self.output)
+        print(f"Refreshed in {time.perf_counter() - start:.2f}s (state as of {self.meta['state_as_of']}).")
+
+        self.csv_hash = csv_hash
+        return True
+
+    def run(self, interval=30.0):
+        print(f"Watching '{self.filename}' every {interval:g}s (Ctrl+C to stop)...")
+        try:
+            while True:
+                self.check()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold new results into the saved state and refresh predictions "
+                                                 "(run 'python predictor.py retrain' first).")
+    parser.add_argument('--csv', default=DATA_FILE)
+    parser.add_argument('--artifacts', default=ARTIFACT_DIR)
+    parser.add_argument('--interval', type=float, default=30.0, help="Seconds between checks of the CSV")
+    parser.add_argument('--retrain-every', type=int, default=RETRAIN_EVERY,
+                        help=f"Refit after this many new results (default: {RETRAIN_EVERY})")
+    parser.add_argument('--output', default=PREDICTIONS_FILE)
+    parser.add_argument('--once', action='store_true', help="Process the CSV once and exit (e.g. right after a scrape)")
+    args = parser.parse_args()
+
+    watcher = Watcher(args.csv, args.artifacts, args.retrain_every, args.output)
+    if args.once:
+        watcher.check()
+    else:
+        watcher.run(args.interval)
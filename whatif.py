@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from dataset import parse_date
+from features import DATA_FILE, FEATURE_PARAMS, feature_columns, load_matches
+from state import MatchState
+
+
+def state_as_of(date, filename=DATA_FILE, params=FEATURE_PARAMS):
+    """MatchState built from the finished games played strictly before `date`."""
+    df = load_matches(filename)
+    return MatchState.from_matches(df[df['Date'] < parse_date(date)], params)
+
+
+def lineup_features(state, fixture, home_lineups, away_lineups):
+    """
+    Feature matrix for one fixture under N candidate lineups. Team features
+    (rest, form) are computed once and broadcast; lineup strengths for all N
+    candidates come from one vectorized lookup per side.
+
+    fixture: dict with date, home_team, away_team. Lineups: lists of names or
+    comma-joined strings; a side given as a single lineup is reused for all N.
+    """
+    home_lineups = _as_candidates(home_lineups)
+    away_lineups = _as_candidates(away_lineups)
+    n = max(len(home_lineups), len(away_lineups))
+    if len(home_lineups) == 1:
+        home_lineups = home_lineups * n
+    if len(away_lineups) == 1:
+        away_lineups = away_lineups * n
+    if len(home_lineups) != len(away_lineups):
+        raise ValueError(f"Got {len(home_lineups)} home and {len(away_lineups)} away lineups.")
+
+    base = state.features(pd.DataFrame({
+        'Date': [parse_date(fixture['date'])],
+        'Home_Team': [fixture['home_team']],
+        'Away_Team': [fixture['away_team']],
+        'Home_Lineup': [np.nan],
+        'Away_Lineup': [np.nan],
+    }))
+    X = pd.DataFrame(np.repeat(base.to_numpy(), n, axis=0), columns=base.columns)
+
+    X['H_Lineup_Strength'] = state.lineup_strength(home_lineups)
+    X['A_Lineup_Strength'] = state.lineup_strength(away_lineups)
+    X['Strength_Diff'] = X['H_Lineup_Strength'] - X['A_Lineup_Strength']
+    return X[feature_columns(state.params)]
+
+
+def score_lineups(clf, state, fixture, home_lineups, away_lineups):
+    """Home win probability for each candidate lineup pair, from a single predict_proba call."""
+    X = lineup_features(state, fixture, home_lineups, away_lineups)
+    return clf.predict_proba(X)[:, list(clf.classes_).index(1)]
+
+
+def swap_variants(lineup, pool):
+    """
+    Every lineup obtained by replacing one player of `lineup` with one player
+    from `pool` (e.g. bench or wider squad). Returns (lineups, swaps) where
+    swaps[i] = (player_out, player_in); the unchanged lineup comes first.
+    """
+    lineup = _names(lineup)
+    pool = [p for p in _names(pool) if p not in lineup]
+    lineups, swaps = [lineup], [(None, None)]
+    for i, out in enumerate(lineup):
+        for new in pool:
+            lineups.append(lineup[:i] + [new] + lineup[i + 1:])
+            swaps.append((out, new))
+    return lineups, swaps
+
+
+def _names(lineup):
+    return list(lineup) if isinstance(lineup, (list, tuple)) else [p.strip() for p in str(lineup).split(',')]
+
+
+def _as_candidates(lineups):
+    """
+    A bare string or a flat list of names is a single lineup; a list of
+    comma-joined strings is one candidate per string. A list mixing the two
+    is ambiguous and rejected.
+    """
+    if isinstance(lineups, str):
+        return [lineups]
+    lineups = list(lineups)
+    strings = [x for x in lineups if isinstance(x, str)]
+    if not strings:
+        return lineups
+    joined = sum(',' in x for x in strings)
+    if len(strings) != len(lineups) or 0 < joined < len(strings):
+        raise ValueError("Lineups must be one lineup (a list of names or a comma-joined string) or a list of "
+                         "candidates (lists of names or comma-joined strings), not a mix.")
+    return lineups if joined else [lineups]